@@ -0,0 +1,521 @@
+"""
+Shared runner for the GRMR-V3 long-document test scripts.
+
+test_long_document_chunked.py, test_long_document_gpu.py and test_long_sample.py
+are thin CLI wrappers around run(). All batching, caching and I/O handling lives
+in iter_corrections(), so every optimization applies to all three modes.
+"""
+
+import argparse
+import glob
+import hashlib
+import heapq
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path, PureWindowsPath
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from satcn.core.utils.llama_utils import (
+    auto_gpu_layers,
+    generate_batch,
+    length_bins,
+    physical_cores,
+)
+from satcn.core.utils.prefilter import looks_clean
+
+# Paragraphs decoded together per batch (parallel sequences sharing each decode step)
+BATCH_SIZE = 8
+
+# Longer paragraphs leave no room in the context window for the response
+MAX_PARAGRAPH_TOKENS = 3500
+
+# A corrected paragraph never contains a blank line
+STOP = ["###", "\n\n"]
+
+_PARA_RE = re.compile(r"\n\s*\n")
+
+# Character names that must survive correction unchanged
+NAMES_TO_CHECK = ["Irina", "Volin", "Seraphim", "Audra"]
+_NAMES_RE = re.compile("|".join(map(re.escape, NAMES_TO_CHECK)))
+
+
+def split_paragraphs(text, min_words=0):
+    """Split text into paragraphs (blank-line separated) of at least ``min_words`` words."""
+    return [p for p in map(str.strip, _PARA_RE.split(text)) if p and len(p.split()) >= min_words]
+
+
+def paragraph_hash(text):
+    """Content hash used as the checkpoint key for a paragraph."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_checkpoint(path):
+    """Load {hash: corrected} from a JSONL checkpoint, ignoring a torn last line."""
+    done = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                done[record["hash"]] = record["corrected"]
+    return done
+
+
+def _ensure_cuda_on_path():
+    """
+    Put the newest installed CUDA toolkit's DLL directory on PATH.
+
+    Must run before ``llama_cpp`` is first imported, since its CUDA backend is
+    loaded (and devices probed) at import time. A no-op where no Windows CUDA
+    toolkit is installed.
+
+    Returns:
+        The directory added or already present, or None if none was found
+    """
+    candidates = glob.glob(r"C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v*\bin\x64")
+    if not candidates:
+        return None
+
+    def version(path):
+        # ...\CUDA\v13.0\bin\x64 -> (13, 0)
+        return tuple(int(n) for n in re.findall(r"\d+", PureWindowsPath(path).parents[1].name))
+
+    cuda_path = max(candidates, key=version)
+    if cuda_path not in os.environ["PATH"].split(os.pathsep):
+        os.environ["PATH"] = cuda_path + os.pathsep + os.environ["PATH"]
+    return cuda_path
+
+
+def correct_paragraphs_server(server_url, prompts, max_tokens=512):
+    """
+    Complete a batch of prompts through a running llama-server.
+
+    Requests are sent concurrently so the server's parallel slots decode them
+    together with continuous batching; ``cache_prompt`` lets each slot reuse
+    the KV cache of the shared instruction prefix between requests.
+
+    Start the server with e.g.:
+        llama-server -m GRMR-V3-Q4B.Q4_K_M.gguf -ngl 99 -c 8192 --parallel 8 --cont-batching
+    """
+
+    def post(prompt):
+        payload = {
+            "prompt": prompt,
+            "n_predict": max_tokens,
+            "temperature": 0.0,
+            "stop": STOP,
+            "cache_prompt": True,
+        }
+        request = urllib.request.Request(
+            f"{server_url.rstrip('/')}/completion",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())["content"]
+
+    with ThreadPoolExecutor(max_workers=len(prompts)) as ex:
+        return list(ex.map(post, prompts))
+
+
+def iter_corrections(
+    filter_obj,
+    paragraphs,
+    *,
+    batch_size=BATCH_SIZE,
+    max_new_tokens=512,
+    checkpoint_path=None,
+    stats=None,
+    server_url=None,
+):
+    """
+    Correct paragraphs with GRMR-V3, yielding ``(index, corrected)`` in document order.
+
+    Three stages run concurrently so the model never waits on Python bookkeeping:
+    a producer thread measures and classifies paragraphs and tokenizes batch
+    prompts, a model thread decodes each batch, and the generator itself
+    checkpoints results and releases them in order. llama.cpp releases the GIL
+    inside its native calls, so plain threads overlap well.
+
+    Paragraphs of similar token length are batched together, and the filter's
+    instruction prefix is prefilled once per batch and shared by every sequence.
+    Paragraphs are kept unchanged without a model call when they are too long for
+    the context, or short with no spelling or punctuation problems; exact repeats
+    reuse the first occurrence's result, and checkpointed ones are not redone.
+
+    Args:
+        filter_obj: A loaded ``GRMRV3GrammarFilter``, or None with ``server_url``
+        paragraphs: Paragraphs to correct
+        batch_size: Paragraphs decoded together per batch
+        max_new_tokens: Upper bound on tokens generated per paragraph
+        checkpoint_path: JSONL file of finished corrections to resume from and append to
+        stats: Counter updated with "too_long", "clean", "repeats" and "resumed" counts
+        server_url: Send batches to a running llama-server instead of ``filter_obj``
+
+    Yields:
+        ``(index, corrected text)`` for every paragraph, in document order
+    """
+    from satcn.core.filters.grmr_v3_filter import GRMRV3GrammarFilter
+
+    template = GRMRV3GrammarFilter.PROMPT_TEMPLATE
+    prefix, footer = template.split("{text}")
+    checkpoint = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    stats = Counter() if stats is None else stats
+    hashes = [paragraph_hash(paragraph) for paragraph in paragraphs]
+    repeat_of = {}
+    work_queue = queue.Queue(maxsize=32)  # (indices, prompts, max_tokens) per batch
+    result_queue = queue.Queue()  # [(index, text or None for a repeat, is_new), ...]
+    errors = []
+
+    def produce():
+        try:
+            # Tokenize every paragraph once: the counts drive the budget check and
+            # length binning, and the IDs become the prompts
+            if server_url:
+                lengths = [len(p) // 4 for p in paragraphs]  # Rough estimate: 1 token ≈ 4 chars
+            else:
+                llm = filter_obj.llm
+                footer_ids = llm.tokenize(footer.encode("utf-8"), add_bos=False, special=True)
+                paragraph_ids = [llm.tokenize(p.encode("utf-8"), add_bos=False) for p in paragraphs]
+                lengths = [len(ids) for ids in paragraph_ids]
+
+            todo = []
+            first_seen = {}
+            ready = []
+            for i, (paragraph, n_tokens) in enumerate(zip(paragraphs, lengths, strict=True)):
+                if n_tokens > MAX_PARAGRAPH_TOKENS:
+                    stats["too_long"] += 1
+                    ready.append((i, paragraph, False))
+                elif looks_clean(paragraph):
+                    stats["clean"] += 1
+                    ready.append((i, paragraph, False))
+                elif paragraph in first_seen:
+                    stats["repeats"] += 1
+                    repeat_of[i] = first_seen[paragraph]
+                    ready.append((i, None, False))
+                elif hashes[i] in checkpoint:
+                    stats["resumed"] += 1
+                    first_seen[paragraph] = i
+                    ready.append((i, checkpoint[hashes[i]], False))
+                else:
+                    first_seen[paragraph] = i
+                    todo.append(i)
+            result_queue.put(ready)
+
+            # Cap each bin's output by its longest input; corrections are about as
+            # long as the original
+            for bin_positions in length_bins([lengths[i] for i in todo]):
+                bin_indices = [todo[k] for k in bin_positions]
+                max_tokens = min(max_new_tokens, 2 * max(lengths[i] for i in bin_indices) + 16)
+                for j in range(0, len(bin_indices), batch_size):
+                    batch = bin_indices[j : j + batch_size]
+                    if server_url:
+                        prompts = [template.format(text=paragraphs[i]) for i in batch]
+                    else:
+                        prompts = [paragraph_ids[i] + footer_ids for i in batch]
+                    work_queue.put((batch, prompts, max_tokens))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            work_queue.put(None)
+
+    def decode():
+        try:
+            while (item := work_queue.get()) is not None:
+                batch, prompts, max_tokens = item
+                if server_url:
+                    outputs = correct_paragraphs_server(server_url, prompts, max_tokens)
+                else:
+                    outputs = generate_batch(
+                        filter_obj.llm, prompts, max_tokens=max_tokens, stop=STOP, prefix=prefix
+                    )
+                result_queue.put(
+                    [
+                        (i, output.strip() or paragraphs[i], True)
+                        for i, output in zip(batch, outputs, strict=True)
+                    ]
+                )
+        except Exception as e:
+            errors.append(e)
+        finally:
+            result_queue.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    threading.Thread(target=decode, daemon=True).start()
+
+    # Results arrive out of order; a min-heap on the index releases them in order
+    corrected = [None] * len(paragraphs)
+    heap = []
+    next_index = 0
+    with (
+        open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else nullcontext()
+    ) as ckpt:
+        while (results := result_queue.get()) is not None:
+            for i, text, is_new in results:
+                heapq.heappush(heap, (i, text))
+                if is_new and ckpt:
+                    record = {"hash": hashes[i], "corrected": text}
+                    ckpt.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if ckpt:
+                ckpt.flush()
+                os.fsync(ckpt.fileno())
+
+            while heap and heap[0][0] == next_index:
+                i, text = heapq.heappop(heap)
+                if text is None:
+                    text = corrected[repeat_of[i]]
+                corrected[i] = text
+                yield i, text
+                next_index += 1
+
+    if errors:
+        raise errors[0]
+
+
+def load_filter(backend, max_new_tokens):
+    """
+    Load the GRMR-V3 filter for a backend ("auto", "cpu" or "gpu").
+
+    The GPU backend offloads as many layers as fit in free VRAM, uses physical
+    cores for the remaining host-side work, and enables flash attention with a
+    q8_0 KV cache, which halves KV bytes read per decode step.
+
+    Returns:
+        The loaded filter, or None if the GPU backend cannot offload to the GPU
+    """
+    if backend == "gpu":
+        cuda_path = _ensure_cuda_on_path()
+        if cuda_path:
+            print(f"   ✓ CUDA on PATH: {cuda_path}")
+
+    import llama_cpp
+
+    from satcn.core.filters.grmr_v3_filter import GRMRV3GrammarFilter, find_model_path
+
+    # A CPU-only build (or a missing CUDA runtime) would load fine but run ~10x slower;
+    # stop before loading rather than report CPU numbers as a GPU benchmark
+    if backend == "gpu" and not llama_cpp.llama_supports_gpu_offload():
+        print("   ❌ llama-cpp-python cannot offload to the GPU (CPU-only build or CUDA")
+        print("      runtime not found); reinstall with CUDA support to run this test")
+        return None
+
+    overrides = {"verbose": False}
+    model_path = find_model_path()
+    if backend == "gpu" and model_path is not None:
+        n_threads = physical_cores()
+        overrides.update(
+            n_gpu_layers=auto_gpu_layers(model_path, n_layers=37),
+            n_threads=n_threads,
+            n_threads_batch=n_threads,
+            flash_attn=True,
+            type_k=llama_cpp.GGML_TYPE_Q8_0,
+            type_v=llama_cpp.GGML_TYPE_Q8_0,
+        )
+
+    device = {"gpu": "cuda", "cpu": "cpu"}.get(backend)
+    return GRMRV3GrammarFilter(
+        model_path=model_path,
+        device=device,
+        max_new_tokens=max_new_tokens,
+        llama_overrides=overrides,
+    )
+
+
+def report_perf(paragraphs, corrected, process_time, *, stats, load_time=None, baseline_wpm=None):
+    """Print throughput, name preservation, scaling estimates and a sample correction."""
+    process_time = max(process_time, 1e-9)
+    words = sum(len(p.split()) for p in paragraphs)
+    words_per_minute = (words / process_time) * 60
+    paragraphs_corrected = sum(
+        corr != orig for orig, corr in zip(paragraphs, corrected, strict=True)
+    )
+
+    print(f"\n{'─' * 70}")
+    print("PERFORMANCE METRICS")
+    print(f"{'─' * 70}")
+    print(f"  Total time: {process_time:.2f}s ({process_time/60:.1f} minutes)")
+    if load_time is not None:
+        print(f"  Model load time: {load_time:.2f}s")
+    print(f"  Paragraphs processed: {len(paragraphs)}")
+    print(f"  Paragraphs corrected: {paragraphs_corrected}")
+    print(f"  Repeated paragraphs reused: {stats['repeats']}")
+    print(f"  Resumed from checkpoint: {stats['resumed']}")
+    print(f"  Skipped as clean: {stats['clean']}")
+    print(f"  Skipped as too long: {stats['too_long']}")
+    print(f"  Time per paragraph: {process_time / len(paragraphs):.2f}s")
+    print(f"  Words per second: {words / process_time:.1f}")
+    print(f"  Processing rate: ~{words_per_minute:.0f} words/minute")
+
+    # Character name preservation check: one regex pass per paragraph finds every name
+    print(f"\n{'─' * 70}")
+    print("CHARACTER NAME PRESERVATION CHECK")
+    print(f"{'─' * 70}")
+    original_counts = Counter(m for p in paragraphs for m in _NAMES_RE.findall(p))
+    corrected_counts = Counter(m for p in corrected for m in _NAMES_RE.findall(p))
+    all_preserved = True
+    for name in NAMES_TO_CHECK:
+        if original_counts[name] > 0:
+            preserved = original_counts[name] == corrected_counts[name]
+            status = "✓" if preserved else "✗"
+            print(f"  {status} '{name}': {original_counts[name]} → {corrected_counts[name]}")
+            all_preserved = all_preserved and preserved
+    if all_preserved:
+        print("\n✓ All character names preserved perfectly!")
+    else:
+        print("\n⚠️  Some character names were changed")
+
+    print(f"\n{'─' * 70}")
+    print("SCALING ESTIMATES (for similar content)")
+    print(f"{'─' * 70}")
+    for label, n_words in [("Short story", 5000), ("Typical chapter", 3500), ("Full novel", 90000)]:
+        minutes = n_words / words_per_minute
+        print(f"  {label} ({n_words:,} words): ~{minutes:.1f} minutes ({minutes/60:.1f} hours)")
+
+    if baseline_wpm:
+        baseline_time = (words / baseline_wpm) * 60
+        print(f"\n{'─' * 70}")
+        print("COMPARISON WITH CPU BASELINE")
+        print(f"{'─' * 70}")
+        print(f"  CPU baseline: {baseline_wpm:.0f} wpm (~{baseline_time/60:.1f} minutes)")
+        print(f"  This run:     {words_per_minute:.0f} wpm ({process_time/60:.1f} minutes)")
+        print(f"  Speedup:      {words_per_minute / baseline_wpm:.2f}x")
+
+    for i, (orig, corr) in enumerate(zip(paragraphs, corrected, strict=True)):
+        if orig != corr:
+            print(f"\nExample correction (paragraph {i+1}):")
+            print(f"Original:  {orig[:200]}...")
+            print(f"Corrected: {corr[:200]}...")
+            break
+
+
+def run(description, title, **defaults):
+    """
+    Parse the command line and correct a long document end to end.
+
+    Args:
+        description: Help text for the command line
+        title: Banner printed at the start of the run
+        **defaults: Defaults for the command-line options of the calling script
+
+    Returns:
+        True if the run completed
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--input", type=Path, default=Path("tools/test_long.md"))
+    parser.add_argument("--output", type=Path, help="Write the corrected document here")
+    parser.add_argument(
+        "--sample", type=int, metavar="N", help="Only correct the first N paragraphs"
+    )
+    parser.add_argument(
+        "--min-words",
+        type=int,
+        default=0,
+        help="Leave out shorter paragraphs (headers, metadata)",
+    )
+    parser.add_argument("--backend", choices=["auto", "cpu", "gpu"], default="auto")
+    parser.add_argument(
+        "--server",
+        metavar="URL",
+        help="Send paragraphs to a running llama-server (e.g. http://127.0.0.1:8080) "
+        "instead of loading the model in-process",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="JSONL file to resume from; finished paragraphs are appended as they complete",
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-new-tokens", type=int, default=512)
+    parser.add_argument("--baseline-wpm", type=float, help="Compare throughput with this rate")
+    parser.set_defaults(**defaults)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(title)
+    print("=" * 70)
+
+    if not args.input.exists():
+        print(f"✗ File not found: {args.input}")
+        return False
+
+    print(f"\nReading: {args.input}")
+    content = args.input.read_text(encoding="utf-8")
+    paragraphs = split_paragraphs(content, args.min_words)[: args.sample]
+    if not paragraphs:
+        print("✗ No paragraphs to process")
+        return False
+
+    print("✓ Loaded document")
+    print(f"  Size: {len(content.encode('utf-8')):,} bytes")
+    print(f"  Words: {len(content.split()):,}")
+    print(f"  Paragraphs to process: {len(paragraphs)}")
+
+    if args.server:
+        # The server owns the model; nothing to load in this process
+        print(f"\nUsing llama-server at {args.server}")
+        filter_obj = None
+        load_time = None
+    else:
+        print(f"\nLoading GRMR-V3 model ({args.backend})...")
+        load_start = time.time()
+        filter_obj = load_filter(args.backend, args.max_new_tokens)
+        if filter_obj is None:
+            return False
+        load_time = time.time() - load_start
+        print(f"✓ Model loaded in {load_time:.2f}s")
+
+    print(f"\nProcessing {len(paragraphs)} paragraphs (batches of {args.batch_size})...")
+    print("Progress: ", end="", flush=True)
+
+    # Corrected paragraphs are streamed to disk in document order as they complete,
+    # so partial output is visible during long runs
+    corrected = list(paragraphs)
+    stats = Counter()
+    process_start = time.time()
+    with open(args.output, "w", encoding="utf-8") if args.output else nullcontext() as out:
+        for i, text in iter_corrections(
+            filter_obj,
+            paragraphs,
+            batch_size=args.batch_size,
+            max_new_tokens=args.max_new_tokens,
+            checkpoint_path=args.checkpoint,
+            stats=stats,
+            server_url=args.server,
+        ):
+            corrected[i] = text
+            if out:
+                out.write(f"\n\n{text}" if i else text)
+                out.flush()
+            if (i + 1) % 10 == 0:
+                print(f"{i + 1}...", end="", flush=True)
+    process_time = time.time() - process_start
+    print(" Done!")
+
+    report_perf(
+        paragraphs,
+        corrected,
+        process_time,
+        stats=stats,
+        load_time=load_time,
+        baseline_wpm=args.baseline_wpm,
+    )
+    if args.output:
+        print(f"\n✓ Output saved to: {args.output}")
+
+    print(f"\n{'═' * 70}")
+    print("TEST COMPLETE")
+    print(f"{'═' * 70}")
+    return True
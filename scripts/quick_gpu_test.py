@@ -21,6 +21,11 @@ llm = Llama(
 load_time = time.time() - start
 print(f"\n✓ Model loaded in {load_time:.2f}s\n")
 
+# Warm up outside the timer so CUDA context init and kernel JIT
+# are not billed to the measured run
+llm("hi", max_tokens=1, temperature=0.0)
+llm.reset()
+
 print("Testing inference speed...")
 prompt = """### Instruction
 You are a copy editor. Fix grammar, spelling, and punctuation while keeping character names, slang, and factual content unchanged. Respond with the corrected text only.
@@ -6,12 +6,70 @@ then generates a combined report showing the impact of GPU acceleration
 on both models.
 """
 
+import asyncio
 import json
-import subprocess
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+
+# Output signatures that mean the run cannot succeed (GPU OOM, CUDA failures)
+FATAL_MARKERS = ("CUDA error", "out of memory", "✗ ERROR")
+
+# Printed by compare_q4_vs_q8.py once per quality test
+PROGRESS_MARKER = "Testing:"
+
+
+async def _run_async(cmd: list[str], device_name: str) -> bool:
+    """
+    Run the comparison subprocess, streaming its output line by line.
+
+    The child is terminated as soon as a fatal marker shows up, rather than
+    letting a failing configuration run to completion.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+
+    progress = tqdm(desc=f"{device_name} tests", unit="test") if tqdm else None
+    write = progress.write if progress else print
+
+    try:
+        async for raw_line in proc.stdout:
+            line = raw_line.decode("utf-8", errors="replace").rstrip()
+            write(line)
+
+            if progress and PROGRESS_MARKER in line:
+                progress.update(1)
+
+            if any(marker in line for marker in FATAL_MARKERS):
+                write(f"\n❌ {device_name} test aborted: {line.strip()}")
+                proc.terminate()
+                await proc.wait()
+                return False
+    finally:
+        if progress:
+            progress.close()
+
+    returncode = await proc.wait()
+    if returncode != 0:
+        print(f"\n❌ {device_name} test failed with exit code {returncode}")
+        return False
+    return True
+
 
 def run_comparison(use_gpu: bool, long_doc: str = "corpus/large.md"):
     """Run the comparison test with specified device."""
@@ -20,21 +78,60 @@ def run_comparison(use_gpu: bool, long_doc: str = "corpus/large.md"):
     print(f"Running Q4 vs Q8 comparison on {device_name}")
     print(f"{'='*80}\n")
 
-    cmd = ["python", "scripts/compare_q4_vs_q8.py", "--long-doc", long_doc]
+    # -u keeps the child's stdout unbuffered so progress can be parsed live
+    cmd = [sys.executable, "-u", "scripts/compare_q4_vs_q8.py", "--long-doc", long_doc]
     if use_gpu:
         cmd.append("--gpu")
 
     try:
-        subprocess.run(cmd, check=True, capture_output=False, text=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"\n❌ {device_name} test failed with exit code {e.returncode}")
-        return False
+        return asyncio.run(_run_async(cmd, device_name))
     except KeyboardInterrupt:
         print(f"\n⚠️  {device_name} test interrupted by user")
         return False
 
 
+def wait_for_free_vram(min_free_gb: float = 6.0, timeout_s: float = 5.0) -> bool:
+    """
+    Wait until GPU 0 has enough free memory for the next phase.
+
+    Replaces a fixed cool-down sleep: returns as soon as the driver reports
+    the memory as free, which is usually immediate. The threshold is capped
+    at 90% of total VRAM so smaller cards can still pass.
+
+    Args:
+        min_free_gb: Free VRAM required before continuing
+        timeout_s: Give up waiting after this many seconds
+
+    Returns:
+        True if the threshold was reached (or pynvml is unavailable)
+    """
+    try:
+        import pynvml
+    except ImportError:
+        return True
+
+    try:
+        pynvml.nvmlInit()
+        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+        total = pynvml.nvmlDeviceGetMemoryInfo(handle).total
+        threshold = min(min_free_gb * 1024**3, total * 0.9)
+
+        deadline = time.monotonic() + timeout_s
+        while pynvml.nvmlDeviceGetMemoryInfo(handle).free < threshold:
+            if time.monotonic() >= deadline:
+                print("⚠️  GPU memory still in use, continuing anyway")
+                return False
+            time.sleep(0.1)
+        return True
+    except pynvml.NVMLError:
+        return True
+    finally:
+        try:
+            pynvml.nvmlShutdown()
+        except pynvml.NVMLError:
+            pass
+
+
 def find_latest_results():
     """Find the two most recent result files."""
     results_dir = Path("results")
@@ -76,14 +173,29 @@ def generate_combined_report(cpu_file: Path, gpu_file: Path):
     print(f"  CPU Pass Rate: {cpu_data['models']['q8']['quality_pass_rate']:.1%}")
     print(f"  GPU Pass Rate: {gpu_data['models']['q8']['quality_pass_rate']:.1%}")
 
-    print("\n⚡ PERFORMANCE COMPARISON:")
+    # Average processing times
+    def avg_time_ms(data: dict, model: str) -> float:
+        tests = data["models"][model]["quality_tests"]
+        return sum(r["processing_time_ms"] for r in tests) / len(tests)
 
-    # Load times
-    print("\nModel Load Times:")
-    print(f"  Q4 CPU: {cpu_data['models']['q4']['load_time_s']:.2f}s")
-    print(f"  Q4 GPU: {gpu_data['models']['q4']['load_time_s']:.2f}s")
-    print(f"  Q8 CPU: {cpu_data['models']['q8']['load_time_s']:.2f}s")
-    print(f"  Q8 GPU: {gpu_data['models']['q8']['load_time_s']:.2f}s")
+    cpu_q4_avg = avg_time_ms(cpu_data, "q4")
+    gpu_q4_avg = avg_time_ms(gpu_data, "q4")
+    cpu_q8_avg = avg_time_ms(cpu_data, "q8")
+    gpu_q8_avg = avg_time_ms(gpu_data, "q8")
+
+    print("\n⚡ PERFORMANCE COMPARISON:")
+    print(f"\n  {'Model':<6} {'Load (s)':>9} {'Avg/test (ms)':>14} {'GPU speedup':>12}")
+    rows = (("q4", cpu_q4_avg, gpu_q4_avg), ("q8", cpu_q8_avg, gpu_q8_avg))
+    for model, cpu_avg, gpu_avg in rows:
+        label = model.upper()
+        print(
+            f"  {label + ' CPU':<6} {cpu_data['models'][model]['load_time_s']:>9.2f} "
+            f"{cpu_avg:>14.0f} {'':>12}"
+        )
+        print(
+            f"  {label + ' GPU':<6} {gpu_data['models'][model]['load_time_s']:>9.2f} "
+            f"{gpu_avg:>14.0f} {cpu_avg / gpu_avg:>11.2f}x"
+        )
 
     # Long document performance
     if "long_document" in cpu_data["models"]["q4"] and not cpu_data["models"]["q4"][
@@ -118,26 +230,6 @@ def generate_combined_report(cpu_file: Path, gpu_file: Path):
         else:
             print(f"  Q8 is {gpu_q4_time / gpu_q8_time:.2f}x faster than Q4 on GPU")
 
-    # Average processing times
-    cpu_q4_avg = sum(
-        r["processing_time_ms"] for r in cpu_data["models"]["q4"]["quality_tests"]
-    ) / len(cpu_data["models"]["q4"]["quality_tests"])
-    gpu_q4_avg = sum(
-        r["processing_time_ms"] for r in gpu_data["models"]["q4"]["quality_tests"]
-    ) / len(gpu_data["models"]["q4"]["quality_tests"])
-    cpu_q8_avg = sum(
-        r["processing_time_ms"] for r in cpu_data["models"]["q8"]["quality_tests"]
-    ) / len(cpu_data["models"]["q8"]["quality_tests"])
-    gpu_q8_avg = sum(
-        r["processing_time_ms"] for r in gpu_data["models"]["q8"]["quality_tests"]
-    ) / len(gpu_data["models"]["q8"]["quality_tests"])
-
-    print("\nAverage Processing Time per Test:")
-    print(f"  Q4 CPU: {cpu_q4_avg:.0f}ms")
-    print(f"  Q4 GPU: {gpu_q4_avg:.0f}ms (speedup: {cpu_q4_avg / gpu_q4_avg:.2f}x)")
-    print(f"  Q8 CPU: {cpu_q8_avg:.0f}ms")
-    print(f"  Q8 GPU: {gpu_q8_avg:.0f}ms (speedup: {cpu_q8_avg / gpu_q8_avg:.2f}x)")
-
     print(f"\n{'='*80}")
     print("FINAL RECOMMENDATION")
     print(f"{'='*80}")
@@ -201,8 +293,11 @@ def generate_combined_report(cpu_file: Path, gpu_file: Path):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     report_file = Path("results") / f"cpu_vs_gpu_combined_{timestamp}.json"
 
-    with open(report_file, "w", encoding="utf-8") as f:
-        json.dump(combined_report, f, indent=2, ensure_ascii=False)
+    with open(report_file, "wb") as f:
+        if orjson is not None:
+            f.write(orjson.dumps(combined_report, option=orjson.OPT_INDENT_2))
+        else:
+            f.write(json.dumps(combined_report, indent=2, ensure_ascii=False).encode("utf-8"))
 
     print(f"📁 Combined report saved to: {report_file}\n")
 
@@ -227,10 +322,8 @@ def main():
         return 1
 
     print("\n✓ CPU test completed successfully!")
-    print("\nStarting GPU test in 5 seconds...")
-    import time
-
-    time.sleep(5)
+    print("\nWaiting for GPU memory to be released...")
+    wait_for_free_vram()
 
     # Run GPU test
     gpu_success = run_comparison(use_gpu=True)
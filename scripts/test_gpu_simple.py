@@ -2,9 +2,13 @@
 Simple GPU test - just check if GPU layers parameter works
 """
 import os
+import sys
 from pathlib import Path
 
-from llama_cpp import Llama
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from satcn.core.utils.llama_utils import build_llama
 
 # Add CUDA to PATH
 cuda_path = r"C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v13.0\bin\x64"
@@ -19,10 +23,11 @@ print(f"Model: {model_path.name}")
 try:
     # Try loading with GPU layers
     print("\nAttempting to load with GPU support (n_gpu_layers=10)...")
-    model = Llama(
-        model_path=str(model_path),
-        n_ctx=512,  # Use model's training context size
+    model = build_llama(
+        model_path,
+        gpu=True,
         n_gpu_layers=10,
+        n_ctx=512,  # Use model's training context size
         verbose=True,
     )
     print("✅ Model loaded successfully with GPU support!")
@@ -2,9 +2,18 @@
 Test GRMR-V3 model with CPU (known working)
 Quick smoke test to verify the model still works after all our changes
 """
+import re
+import sys
 import time
+from pathlib import Path
 
-from pipeline.filters.grmr_v3_filter import GRMRV3GrammarFilter
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from satcn.core.filters.grmr_v3_filter import GRMRV3GrammarFilter, find_model_path
+from satcn.core.utils.llama_utils import generate_batch, pick_quant
 
 
 def test_grmr_v3_cpu():
@@ -25,33 +34,68 @@ def test_grmr_v3_cpu():
         {"input": "She should of went to the party.", "expected_fixes": ["have gone"]},
     ]
 
+    # One case-insensitive alternation per test, so each output is scanned once
+    for test in test_cases:
+        test["pattern"] = re.compile(
+            "|".join(map(re.escape, test["expected_fixes"])), re.IGNORECASE
+        )
+
     print("\nInitializing GRMR-V3 filter...")
     start = time.time()
-    filter_obj = GRMRV3GrammarFilter()
+    # CPU runs prefer the Q8_0 file when present (no int4 dequant step)
+    model_path = find_model_path()
+    if model_path is not None:
+        model_path = pick_quant(model_path, n_gpu_layers=0)
+        print(f"Model: {model_path.name}")
+    filter_obj = GRMRV3GrammarFilter(
+        model_path=str(model_path) if model_path else None, device="cpu"
+    )
     init_time = time.time() - start
     print(f"✅ Model loaded in {init_time:.2f}s")
 
-    print("\nRunning correction tests...\n")
+    print("\nRunning correction tests in one batch...\n")
+
+    # Tokenize every prompt exactly once into a padded int32 buffer plus lengths
+    llm = filter_obj.llm
+    prompt_ids = [
+        llm.tokenize(filter_obj._build_prompt(test["input"]).encode("utf-8"), special=True)
+        for test in test_cases
+    ]
+    lengths = np.array([len(ids) for ids in prompt_ids], dtype=np.int32)
+    token_buf = np.zeros((len(prompt_ids), lengths.max()), dtype=np.int32)
+    for row, ids in enumerate(prompt_ids):
+        token_buf[row, : len(ids)] = ids
+
+    # Corrections are about as long as their input, so cap generation per test;
+    # input length is the prompt length minus the fixed template overhead
+    template_len = len(llm.tokenize(filter_obj._build_prompt("").encode("utf-8"), special=True))
+    max_tokens = [
+        min(filter_obj.max_new_tokens, 2 * max(0, int(n) - template_len) + 16) for n in lengths
+    ]
+
+    # Submit every prompt together so they share prefill and decode steps
+    start = time.time()
+    outputs = generate_batch(
+        llm,
+        [row[:n].tolist() for row, n in zip(token_buf, lengths, strict=True)],
+        max_tokens=max_tokens,
+        stop=["###", "\n\n\n"],
+    )
+    total_time = time.time() - start
 
     passed = 0
     failed = 0
 
-    for i, test in enumerate(test_cases, 1):
+    for i, (test, output) in enumerate(zip(test_cases, outputs, strict=True), 1):
         input_text = test["input"]
-        expected_fixes = test["expected_fixes"]
+        corrected = output.strip()
 
         print(f"Test {i}:")
         print(f"  Input:    {input_text}")
-
-        start = time.time()
-        corrected = filter_obj.correct_text(input_text)
-        elapsed = time.time() - start
-
         print(f"  Output:   {corrected}")
-        print(f"  Time:     {elapsed:.2f}s")
 
         # Check if any expected fixes are present
-        has_fixes = any(fix.lower() in corrected.lower() for fix in expected_fixes)
+        has_fixes = test["pattern"].search(corrected) is not None
 
         if corrected != input_text and has_fixes:
             print("  Status:   ✅ PASSED (corrections applied)")
@@ -65,18 +109,14 @@ def test_grmr_v3_cpu():
 
         print()
 
-    # Get statistics
-    stats = filter_obj.get_stats()
-
     print("=" * 60)
     print("Test Results Summary")
     print("=" * 60)
     print(f"Tests passed:        {passed}/{len(test_cases)}")
     print(f"Tests failed:        {failed}/{len(test_cases)}")
-    print("\nModel Statistics:")
-    print(f"  Total corrections: {stats['total_corrections']}")
-    print(f"  Total tokens:      {stats['total_tokens_generated']}")
-    print(f"  Avg time/text:     {stats['average_correction_time']:.2f}s")
+    print("\nTiming:")
+    print(f"  Batch time:        {total_time:.2f}s")
+    print(f"  Avg time/text:     {total_time / len(test_cases):.2f}s")
     print("=" * 60)
 
     if passed >= 4:
@@ -4,22 +4,59 @@ Test HuggingFace downloader functionality.
 This script tests the HuggingFace Hub integration without running the full GUI.
 """
 
-from pathlib import Path
+import functools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlsplit
 
 from huggingface_hub import list_repo_files
 
+# Known GGUF repos; listing is network-bound, so they are probed in parallel
+TEST_REPOS = [
+    "TheBloke/Mistral-7B-Instruct-v0.2-GGUF",
+]
+
+LISTING_CACHE_DIR = Path.home() / ".cache" / "satcn" / "hf_listings"
+
+
+@functools.lru_cache(maxsize=None)
+def cached_list_repo_files(repo_id, ttl=3600):
+    """List repo files, reusing an on-disk listing younger than ``ttl`` seconds."""
+    cache_file = LISTING_CACHE_DIR / f"{repo_id.replace('/', '--')}.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime < ttl:
+            return json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+
+    files = list_repo_files(repo_id)
+    try:
+        LISTING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(files), encoding="utf-8")
+    except OSError:
+        pass
+    return files
+
 
 def test_list_repo_files():
-    """Test listing files in a HuggingFace repo."""
+    """Test listing files in HuggingFace repos."""
     print("Testing: List repo files")
     print("-" * 50)
 
-    # Test with a known GGUF repo
-    repo_id = "TheBloke/Mistral-7B-Instruct-v0.2-GGUF"
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        futures = {repo_id: ex.submit(cached_list_repo_files, repo_id) for repo_id in TEST_REPOS}
 
-    try:
+    ok = True
+    for repo_id, future in futures.items():
         print(f"Listing files in: {repo_id}")
-        files = list_repo_files(repo_id)
+        try:
+            files = future.result()
+        except Exception as e:
+            print(f"Error: {e}")
+            ok = False
+            continue
 
         # Filter for GGUF files
         gguf_files = [f for f in files if f.endswith(".gguf")]
@@ -28,11 +65,7 @@ def test_list_repo_files():
         for i, file in enumerate(gguf_files, 1):
             print(f"  {i}. {file}")
 
-        return True
-
-    except Exception as e:
-        print(f"Error: {e}")
-        return False
+    return ok
 
 
 def test_parse_url():
@@ -50,16 +83,13 @@ def test_parse_url():
         print(f"\nURL: {url}")
 
         try:
-            parts = url.replace("https://", "").replace("huggingface.co/", "").split("/")
-
-            username = parts[0]
-            repo_name = parts[1]
-            repo_id = f"{username}/{repo_name}"
+            parts = PurePosixPath(urlsplit(url).path).parts[1:]  # drop leading "/"
+            repo_id = f"{parts[0]}/{parts[1]}"
 
             print(f"  Repo ID: {repo_id}")
 
             # Check if specific file is mentioned
-            if len(parts) > 3 and parts[2] in ["blob", "resolve"]:
+            if len(parts) >= 4 and parts[2] in {"blob", "resolve"}:
                 filename = "/".join(parts[4:])
                 print(f"  Filename: {filename}")
             else:
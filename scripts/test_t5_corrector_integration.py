@@ -245,15 +245,44 @@ def benchmark_performance():
 
     test_text = "This sentance have some erors that need to be corrected by the model."
 
+    # On CUDA, synchronize around each pass so the timing covers kernel execution,
+    # not just dispatch, and track peak memory separately
+    try:
+        import torch
+
+        cuda = corrector.device == "cuda" and torch.cuda.is_available()
+    except ImportError:
+        cuda = False
+
+    def sync():
+        if cuda:
+            torch.cuda.synchronize()
+
+    # Warm-up passes pay one-time costs (kernel selection, allocator growth) and
+    # are discarded so they do not bias the statistics
+    print("Running 2 warm-up passes...")
+    for _ in range(2):
+        corrector.correct(test_text)
+    sync()
+
     print("Running 5 correction passes for benchmarking...")
     durations = []
+    peak_memory = []
 
     for i in range(5):
-        start = time.time()
+        if cuda:
+            torch.cuda.reset_peak_memory_stats()
+        sync()
+        start = time.perf_counter_ns()
         corrector.correct(test_text)
-        duration = time.time() - start
+        sync()
+        duration = (time.perf_counter_ns() - start) / 1e9
         durations.append(duration)
-        print(f"  Pass {i+1}: {duration:.3f}s")
+        line = f"  Pass {i+1}: {duration:.3f}s"
+        if cuda:
+            peak_memory.append(torch.cuda.max_memory_allocated() / 1024**2)
+            line += f" (peak {peak_memory[-1]:.0f} MB)"
+        print(line)
 
     print()
     print("Statistics:")
@@ -261,6 +290,8 @@ def benchmark_performance():
     print(f"  Median: {statistics.median(durations):.3f}s")
     print(f"  Min: {min(durations):.3f}s")
     print(f"  Max: {max(durations):.3f}s")
+    if peak_memory:
+        print(f"  Peak GPU memory: {max(peak_memory):.0f} MB")
     print()
 
 
@@ -6,7 +6,10 @@ This script validates that SATCN is properly installed and configured.
 It checks Python version, package installation, entry points, and dependencies.
 """
 
+import importlib.util
+import os
 import sys
+import sysconfig
 import subprocess
 import shutil
 from pathlib import Path
@@ -76,12 +79,28 @@ def check_satcn_installed():
         return False
 
 
+def find_entry_point(name, scripts_dir, scripts):
+    """Locate a console script, looking in pip's scripts directory before PATH."""
+    for candidate in (name, f"{name}.exe"):
+        if candidate in scripts:
+            return str(scripts_dir / candidate)
+    return shutil.which(name)
+
+
 def check_entry_points():
     """Check if entry points are working."""
     checks = []
 
+    # pip installs console scripts next to the interpreter; one listing of that
+    # directory answers both lookups without walking every PATH entry per name
+    scripts_dir = Path(sysconfig.get_path("scripts"))
+    try:
+        scripts = set(os.listdir(scripts_dir))
+    except OSError:
+        scripts = set()
+
     # Check satcn CLI
-    satcn_path = shutil.which("satcn")
+    satcn_path = find_entry_point("satcn", scripts_dir, scripts)
     if satcn_path:
         checks.append(print_check(True, f"CLI entry point 'satcn' found: {satcn_path}"))
     else:
@@ -92,7 +111,7 @@ def check_entry_points():
         ))
 
     # Check satcn-gui
-    gui_path = shutil.which("satcn-gui")
+    gui_path = find_entry_point("satcn-gui", scripts_dir, scripts)
     if gui_path:
         checks.append(print_check(True, f"GUI entry point 'satcn-gui' found: {gui_path}"))
     else:
@@ -117,13 +136,8 @@ def check_extras_installed():
     }
 
     for extra_name, packages in extras.items():
-        all_installed = True
-        for package in packages:
-            try:
-                __import__(package)
-            except ImportError:
-                all_installed = False
-                break
+        # find_spec only locates the package; importing torch/transformers takes seconds
+        all_installed = all(importlib.util.find_spec(package) is not None for package in packages)
 
         if all_installed:
             print_check(True, f"[{extra_name}] extra installed")
@@ -135,11 +149,11 @@ def check_system_dependencies():
     """Check system-level dependencies."""
     print("\n🔧 System dependencies:")
 
-    # Check tkinter (required for GUI on Linux)
-    try:
-        import tkinter
+    # Check tkinter (required for GUI on Linux). The pure-Python package ships with
+    # CPython even when the _tkinter extension it needs is missing, so look for that.
+    if importlib.util.find_spec("_tkinter") is not None:
         print_check(True, "tkinter available")
-    except ImportError:
+    else:
         if sys.platform.startswith("linux"):
             print_check(
                 False,
@@ -154,12 +168,10 @@ def check_gpu_support():
     """Check if GPU support is available."""
     print("\n🎮 GPU support:")
 
-    try:
-        from llama_cpp import Llama
-        # Try to check if CUDA is available
+    if importlib.util.find_spec("llama_cpp") is not None:
         # Note: This is a basic check, actual GPU usage depends on model loading
         print_check(True, "llama-cpp-python installed (GPU support may be available)")
-    except ImportError:
+    else:
         print_check(
             False,
             "llama-cpp-python not installed",
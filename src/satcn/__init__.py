@@ -6,13 +6,19 @@ before TTS playback.
 
 __version__ = "0.1.0"
 
-# Import core components for convenience
-# But allow the package to be imported even if components fail
-try:
-    from satcn.core.pipeline_runner import PipelineRunner
+__all__ = ["PipelineRunner", "__version__"]
 
-    __all__ = ["PipelineRunner", "__version__"]
-except ImportError:
-    # Allow package to be imported even if dependencies missing
-    PipelineRunner = None
-    __all__ = ["__version__"]
+
+def __getattr__(name):
+    # PipelineRunner is imported on first access (PEP 562) to keep ``import satcn``
+    # light. It resolves to None if its dependencies are missing.
+    if name != "PipelineRunner":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        from satcn.core.pipeline_runner import PipelineRunner
+    except ImportError:
+        PipelineRunner = None
+
+    globals()[name] = PipelineRunner
+    return PipelineRunner
@@ -1,6 +1,7 @@
 """CLI interface for SATCN pipeline."""
 
 import argparse
+import mmap
 import sys
 from pathlib import Path
 
@@ -52,11 +53,21 @@ def main():
 
     args = parser.parse_args()
 
-    # Validate input file exists
+    # Open the input once and hand the mapped contents to the parser, rather than
+    # checking it exists here and having the pipeline open it again later
     input_path = Path(args.input_file)
-    if not input_path.exists():
+    try:
+        with open(input_path, "rb") as f:
+            input_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, IsADirectoryError):
         print(f"Error: Input file not found: {input_path}", file=sys.stderr)
         return 1
+    except OSError as e:
+        # Unreadable input (permissions, I/O errors) exits like a pipeline failure
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except ValueError:
+        input_buffer = b""  # mmap cannot map an empty file
 
     # Run pipeline
     try:
@@ -68,6 +79,7 @@ def main():
             use_grmr=args.use_grmr,
             grmr_mode=args.grmr_mode,
             grmr_model_path=args.grmr_model_path,
+            input_buffer=input_buffer,
         )
         runner.run()
         print(
@@ -77,6 +89,9 @@ def main():
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
+    finally:
+        if isinstance(input_buffer, mmap.mmap):
+            input_buffer.close()
 
 
 if __name__ == "__main__":
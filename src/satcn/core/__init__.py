@@ -1,5 +1,15 @@
 """Core pipeline and filtering functionality."""
 
-from satcn.core.pipeline_runner import PipelineRunner
-
 __all__ = ["PipelineRunner"]
+
+
+def __getattr__(name):
+    # Imported on first access (PEP 562) so importing a submodule such as
+    # satcn.core.filters does not also import the pipeline runner.
+    if name != "PipelineRunner":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from satcn.core.pipeline_runner import PipelineRunner
+
+    globals()[name] = PipelineRunner
+    return PipelineRunner
@@ -8,6 +8,8 @@ This module contains various filters for text processing:
 - Markdown/EPUB parsing
 """
 
+import importlib
+
 from satcn.core.filters.epub_parser import EpubOutputGenerator, EpubParserFilter
 from satcn.core.filters.grammar_filter import GrammarCorrectionFilter
 from satcn.core.filters.grammar_filter_safe import GrammarCorrectionFilterSafe
@@ -15,25 +17,36 @@ from satcn.core.filters.markdown_parser import MarkdownOutputGenerator, Markdown
 from satcn.core.filters.spelling_filter import SpellingCorrectionFilter
 from satcn.core.filters.tts_normalizer import TTSNormalizer
 
-# Optional: T5 filters (require transformers + torch)
-try:
-    from satcn.core.filters.t5_correction_filter import T5CorrectionFilter
-    from satcn.core.filters.t5_grammar_filter import T5GrammarFilter
+# Optional model-backed filters are imported on first access (PEP 562), so
+# importing the package (e.g. for ``satcn --help``) does not pull in torch,
+# transformers or llama-cpp-python. A name resolves to None when its
+# dependencies are missing.
+_LAZY = {
+    "T5CorrectionFilter": "satcn.core.filters.t5_correction_filter",
+    "T5GrammarFilter": "satcn.core.filters.t5_grammar_filter",
+    "GRMRV3GrammarFilter": "satcn.core.filters.grmr_v3_filter",
+}
+
+_AVAILABILITY = {
+    "T5_AVAILABLE": ("T5CorrectionFilter", "T5GrammarFilter"),
+    "GRMR_V3_AVAILABLE": ("GRMRV3GrammarFilter",),
+}
+
 
-    T5_AVAILABLE = True
-except ImportError:
-    T5CorrectionFilter = None
-    T5GrammarFilter = None
-    T5_AVAILABLE = False
+def __getattr__(name):
+    if name in _LAZY:
+        try:
+            value = getattr(importlib.import_module(_LAZY[name]), name)
+        except ImportError:
+            value = None
+    elif name in _AVAILABILITY:
+        value = all(__getattr__(filter_name) is not None for filter_name in _AVAILABILITY[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Optional: GRMR-V3 GGUF filter (requires llama-cpp-python)
-try:
-    from satcn.core.filters.grmr_v3_filter import GRMRV3GrammarFilter
+    globals()[name] = value
+    return value
 
-    GRMR_V3_AVAILABLE = True
-except ImportError:
-    GRMRV3GrammarFilter = None
-    GRMR_V3_AVAILABLE = False
 
 __all__ = [
     "GrammarCorrectionFilter",
@@ -48,4 +61,5 @@ __all__ = [
     "EpubOutputGenerator",
     "GRMRV3GrammarFilter",
     "GRMR_V3_AVAILABLE",
+    "T5_AVAILABLE",
 ]
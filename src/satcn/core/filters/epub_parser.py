@@ -1,11 +1,128 @@
 # pipeline/filters/epub_parser.py
+import bisect
+import copy
+import difflib
+import io
 import logging
+import os
+import re
 import uuid
+import warnings
+from functools import lru_cache
 
 import ebooklib
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, XMLParsedAsHTMLWarning
 from ebooklib import epub
 
+# Words, single punctuation marks and whitespace runs, the units corrections are
+# aligned on when writing them back into a paragraph with inline markup
+_TOKEN_RE = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+def _read_epub(filepath):
+    """
+    Read an EPUB file and parse each of its HTML documents.
+
+    Returns:
+        tuple: The book and a dict mapping item names to parsed documents
+    """
+    book = epub.read_epub(filepath)
+
+    # lxml (already required by ebooklib) builds the tree much faster than the
+    # pure-Python html.parser. EPUB documents are XHTML, which it handles fine;
+    # ebooklib re-serializes them as XHTML on write.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", XMLParsedAsHTMLWarning)
+        html_docs = {
+            item.get_name(): BeautifulSoup(item.get_content(), "lxml")
+            for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT)
+        }
+    return book, html_docs
+
+
+@lru_cache(maxsize=4)
+def _read_epub_cached(filepath, mtime):
+    """
+    Memoized _read_epub; ``mtime`` is part of the key so edits invalidate it.
+
+    The returned objects are shared between callers and must not be mutated.
+    """
+    return _read_epub(filepath)
+
+
+def _tokens(text):
+    """Split text into (start, end, key) tokens; all whitespace compares equal."""
+    return [
+        (m.start(), m.end(), " " if m.group().isspace() else m.group())
+        for m in _TOKEN_RE.finditer(text)
+    ]
+
+
+def _write_paragraph(element, corrected):
+    """
+    Write corrected text into a paragraph, keeping its inline markup.
+
+    A paragraph holding a single string is replaced outright. Otherwise the
+    correction is aligned with the paragraph's text token by token, and each
+    change is applied to the one text node it falls in, so tags such as <i>,
+    <b> and <a> stay where they were.
+
+    Args:
+        element: The paragraph's BeautifulSoup tag
+        corrected (str): Corrected, whitespace-normalized paragraph text
+
+    Returns:
+        bool: False if a change straddles two text nodes and the paragraph
+        was left as it was
+    """
+    if element.string is not None:
+        element.string = corrected
+        return True
+
+    nodes = [node for node in element.find_all(string=True) if type(node) is NavigableString]
+    starts = []
+    raw = ""
+    for node in nodes:
+        starts.append(len(raw))
+        raw += node
+
+    original = _tokens(raw)
+    # Leading and trailing whitespace is not part of the extracted text
+    while original and original[0][2] == " ":
+        original.pop(0)
+    while original and original[-1][2] == " ":
+        original.pop()
+    replacement = _tokens(corrected)
+
+    # (node index, start, end, new text) per change, offsets local to the node
+    edits = []
+    matcher = difflib.SequenceMatcher(
+        None, [t[2] for t in original], [t[2] for t in replacement], autojunk=False
+    )
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        if i1 < i2:
+            start, end = original[i1][0], original[i2 - 1][1]
+            first = bisect.bisect_right(starts, start) - 1
+            if bisect.bisect_right(starts, end - 1) - 1 != first:
+                return False
+        else:
+            # Insertion: attach to the node holding the preceding text
+            start = end = original[i1 - 1][1] if i1 else original[0][0]
+            first = bisect.bisect_right(starts, max(start - 1, 0)) - 1
+        text = corrected[replacement[j1][0] : replacement[j2 - 1][1]] if j1 < j2 else ""
+        edits.append((first, start - starts[first], end - starts[first], text))
+
+    # Apply back to front so earlier offsets in the same node stay valid
+    new_text = [str(node) for node in nodes]
+    for index, start, end, text in reversed(edits):
+        new_text[index] = new_text[index][:start] + text + new_text[index][end:]
+    for node, text in zip(nodes, new_text, strict=True):
+        if text != node:
+            node.replace_with(NavigableString(text))
+    return True
+
 
 class EpubParserFilter:
     """
@@ -13,25 +130,50 @@ class EpubParserFilter:
     data structure for subsequent processing.
     """
 
+    def __init__(self, shared=False, buffer=None):
+        """
+        Args:
+            shared (bool): Reuse the parsed book and documents from an earlier
+                parse of the same unmodified file instead of unzipping and
+                parsing every HTML document again. The shared objects are
+                read-only; EpubOutputGenerator copies them before writing.
+            buffer: Already-opened file contents (bytes or a read-only mmap) to
+                parse instead of opening the file again. The file path is then
+                only used to name the output.
+        """
+        self.shared = shared and buffer is None
+        self.buffer = buffer
+
     def process(self, filepath):
         """
         Processes an EPUB file and returns a dictionary containing the
         extracted text blocks and the parsed book.
         """
         try:
-            book = epub.read_epub(filepath)
+            if self.buffer is not None:
+                # zipfile needs a seekable file object, which mmap is not
+                book, html_docs = _read_epub(io.BytesIO(self.buffer))
+            elif self.shared:
+                book, html_docs = _read_epub_cached(filepath, os.path.getmtime(filepath))
+            else:
+                book, html_docs = _read_epub(filepath)
             text_blocks = []
-            html_docs = {}
 
-            for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
-                soup = BeautifulSoup(item.get_content(), "html.parser")
-                html_docs[item.get_name()] = soup
-                for p in soup.find_all("p"):
-                    if p.string and p.string.strip():
+            for item_name, soup in html_docs.items():
+                for index, p in enumerate(soup.find_all("p")):
+                    # get_text() also covers paragraphs with inline markup such as
+                    # <i>, for which p.string is None
+                    text = " ".join(p.get_text().split())
+                    if text:
                         text_blocks.append(
                             {
-                                "content": p.string.strip(),
-                                "metadata": {"element": p, "item_name": item.get_name()},
+                                "content": text,
+                                "metadata": {
+                                    "element": p,
+                                    "item_name": item_name,
+                                    "index": index,
+                                    "text": text,
+                                },
                             }
                         )
 
@@ -41,6 +183,7 @@ class EpubParserFilter:
                 "html_docs": html_docs,
                 "format": "epub",
                 "filepath": filepath,
+                "shared": self.shared,
             }
         except Exception as e:
             logging.error(f"Error parsing EPUB file {filepath}: {e}", exc_info=True)
@@ -59,26 +202,64 @@ class EpubOutputGenerator:
         updates the book, and writes it to a file.
         """
         try:
-            for block in data["text_blocks"]:
+            book = data["book"]
+            html_docs = data["html_docs"]
+
+            # Only rewrite changed paragraphs
+            changed = [
+                block
+                for block in data["text_blocks"]
+                if block["content"] != block["metadata"].get("text")
+            ]
+            changed_items = {block["metadata"]["item_name"] for block in changed}
+
+            if data.get("shared"):
+                # The parse is cached and shared; copy only the documents (and book
+                # items) that change, locating each paragraph in the copy by index
+                html_docs = {
+                    **html_docs,
+                    **{name: copy.deepcopy(html_docs[name]) for name in changed_items},
+                }
+                book = copy.copy(book)
+                book.items = [
+                    copy.copy(item) if item.get_name() in changed_items else item
+                    for item in book.items
+                ]
+                paragraphs = {name: html_docs[name].find_all("p") for name in changed_items}
+                for block in changed:
+                    metadata = block["metadata"]
+                    metadata["element"] = paragraphs[metadata["item_name"]][metadata["index"]]
+
+            for block in changed:
                 # The 'element' in metadata is the BeautifulSoup tag
-                block["metadata"]["element"].string = block["content"]
+                if not _write_paragraph(block["metadata"]["element"], block["content"]):
+                    logging.warning(
+                        "Skipping correction that would break inline markup in %s: %r",
+                        block["metadata"]["item_name"],
+                        block["content"],
+                    )
 
-            for item_name, soup in data["html_docs"].items():
-                # Find the corresponding item in the book and update its content
-                for item in data["book"].get_items_of_type(ebooklib.ITEM_DOCUMENT):
-                    if item.get_name() == item_name:
-                        item.set_content(str(soup).encode("utf-8"))
-                        break
+            # Re-serialize only the documents that changed
+            items = {
+                item.get_name(): item for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT)
+            }
+            for item_name in changed_items:
+                items[item_name].set_content(html_docs[item_name].encode("utf-8"))
 
             # Ensure all TOC items have a UID
-            for item in data["book"].toc:
+            for item in book.toc:
                 if not item.uid:
                     item.uid = str(uuid.uuid4())
 
             output_filepath = data["filepath"].replace(".epub", "_corrected.epub")
-            epub.write_epub(output_filepath, data["book"], {})
+            epub.write_epub(output_filepath, book, {})
 
-            return {**data, "output_filepath": output_filepath}
+            return {
+                **data,
+                "book": book,
+                "html_docs": html_docs,
+                "output_filepath": output_filepath,
+            }
         except Exception as e:
             logging.error(
                 f"Error generating EPUB file for {data.get('filepath', 'Unknown')}: {e}",
@@ -1,12 +1,40 @@
+import bisect
 import logging
 import time
-
-from satcn.core.utils.language_tool_utils import get_language_tool
+from operator import itemgetter
+
+from satcn.core.utils.content_cache import ContentCache
+from satcn.core.utils.language_tool_utils import get_language_tool, is_transient_error
+from satcn.core.utils.prefilter import needs_rule_check
+
+# LanguageTool rules whose suggestions are safe to apply automatically, by the
+# category they are counted under. Only used to build the two lookups below.
+_RULE_TO_CATEGORY = {
+    "MORFOLOGIK_RULE_EN_US": "TYPOS",
+    "ENGLISH_WORD_REPEAT_RULE": "TYPOS",
+    "COMMA_PARENTHESIS_WHITESPACE": "PUNCTUATION",
+    "EN_QUOTES": "PUNCTUATION",
+    "UNPAIRED_BRACKETS": "PUNCTUATION",
+    "WHITESPACE_RULE": "SPACING",
+    "SENTENCE_WHITESPACE": "SPACING",
+    "UPPERCASE_SENTENCE_START": "CASING",
+    "PERSPECTIVE_AGREEMENT": "SIMPLE_AGREEMENT",
+}
+_STAT_KEYS = {category: f"{category.lower()}_fixed" for category in _RULE_TO_CATEGORY.values()}
+# Rule ID straight to the stats key it counts towards, resolved once per match
+_RULE_TO_STAT_KEY = {rule: _STAT_KEYS[category] for rule, category in _RULE_TO_CATEGORY.items()}
 
 
 class GrammarCorrectionFilterSafe:
+    # Blocks are checked several at a time, joined by a blank line so each one
+    # starts its own paragraph. Batches stay under the public API's 20 KB limit.
+    BATCH_SEPARATOR = "\n\n"
+    MAX_BATCH_CHARS = 20000
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # (corrected text, stats) by block text, so repeated blocks skip LanguageTool
+        self._cache = ContentCache()
         self.tool, self.backend = get_language_tool(logger=self.logger)
         if not self.tool:
             self.logger.warning(
@@ -22,6 +50,10 @@ class GrammarCorrectionFilterSafe:
             try:
                 return self.tool.check(text)
             except Exception as exc:
+                # Retrying cannot fix a bad request or response; only wait out
+                # connection problems, rate limits and server restarts
+                if not is_transient_error(exc):
+                    raise
                 self.logger.warning(
                     "LanguageTool check failed; retrying.",
                     extra={
@@ -36,22 +68,6 @@ class GrammarCorrectionFilterSafe:
                 time.sleep(delay)
                 delay *= 2
 
-    def _get_safe_category(self, match):
-        """
-        Classifies a LanguageTool match into a safe category based on a hardcoded set of rule IDs.
-        """
-        if match.ruleId in {"MORFOLOGIK_RULE_EN_US", "ENGLISH_WORD_REPEAT_RULE"}:
-            return "TYPOS"
-        if match.ruleId in {"COMMA_PARENTHESIS_WHITESPACE", "EN_QUOTES", "UNPAIRED_BRACKETS"}:
-            return "PUNCTUATION"
-        if match.ruleId in {"WHITESPACE_RULE", "SENTENCE_WHITESPACE"}:
-            return "SPACING"
-        if match.ruleId in {"UPPERCASE_SENTENCE_START"}:
-            return "CASING"
-        if match.ruleId in {"PERSPECTIVE_AGREEMENT"}:
-            return "SIMPLE_AGREEMENT"
-        return None
-
     def _validate_markdown_structure(self, original_text, corrected_text):
         """
         A minimal parity check for Markdown symbols.
@@ -61,27 +77,24 @@ class GrammarCorrectionFilterSafe:
                 return False
         return True
 
-    def _process_text(self, text):
-        """
-        Applies safe grammar corrections to a single string.
+    def _empty_stats(self):
+        return dict.fromkeys(_STAT_KEYS.values(), 0)
+
+    def _check_batch(self, texts):
         """
-        stats = {
-            "typos_fixed": 0,
-            "punctuation_fixed": 0,
-            "spacing_fixed": 0,
-            "casing_fixed": 0,
-            "simple_agreement_fixed": 0,
-        }
+        Checks several strings with a single LanguageTool request.
 
-        if not self.tool:
-            self.logger.debug(
-                "Skipping grammar corrections; LanguageTool disabled.",
-                extra={"event": "language_tool_skipped"},
-            )
-            return text, stats
+        Returns a list with, per string, its (local offset, match) pairs, or None
+        for every string if the check failed after retries.
+        """
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(self.BATCH_SEPARATOR)
 
         try:
-            matches = self._check_with_retry(text)
+            matches = self._check_with_retry(self.BATCH_SEPARATOR.join(texts))
         except Exception:
             self.logger.error(
                 "LanguageTool check failed after retries.",
@@ -91,35 +104,91 @@ class GrammarCorrectionFilterSafe:
                     "backend": getattr(self, "backend", "unknown"),
                 },
             )
-            return text, dict.fromkeys(stats, 0)
+            return [None] * len(texts)
 
-        safe_matches = []
+        text_matches = [[] for _ in texts]
         for match in matches:
-            category = self._get_safe_category(match)
-            if category and match.replacements:
-                safe_matches.append((match, category))
-
-        # Sort matches by offset in reverse order to apply changes without index conflicts
-        safe_matches.sort(key=lambda item: item[0].offset, reverse=True)
-
-        corrected_text = text
-        for match, category in safe_matches:
-            start = match.offset
-            end = match.offset + match.errorLength
-            replacement = match.replacements[0]
-            corrected_text = corrected_text[:start] + replacement + corrected_text[end:]
-
-            stat_key = f"{category.lower()}_fixed"
-            if stat_key in stats:
-                stats[stat_key] += 1
-
-        # Final validation of markdown structure
-        if not self._validate_markdown_structure(text, corrected_text):
+            i = bisect.bisect_right(starts, match.offset) - 1
+            local_offset = match.offset - starts[i]
+            # Drop matches that reach into the separator or the next string
+            if local_offset + match.errorLength <= len(texts[i]):
+                text_matches[i].append((local_offset, match))
+        return text_matches
+
+    def _apply_matches(self, text, matches):
+        """
+        Applies the safe subset of (local offset, match) pairs to a single string.
+        """
+        stats = self._empty_stats()
+        if matches is None:
+            return text, stats
+
+        # (offset, length, replacement, stats key) for each safe match, read off
+        # the match objects once
+        safe_matches = [
+            (offset, match.errorLength, match.replacements[0], stat_key)
+            for offset, match in matches
+            if (stat_key := _RULE_TO_STAT_KEY.get(match.ruleId)) and match.replacements
+        ]
+        if not safe_matches:
+            # Nothing to apply, so nothing to rebuild or validate
+            return text, stats
+
+        # Build the result in one forward pass over the matches, instead of copying
+        # the whole string for every replacement
+        safe_matches.sort(key=itemgetter(0))
+
+        parts = []
+        replaced = []
+        inserted = []
+        cursor = 0
+        for start, length, replacement, stat_key in safe_matches:
+            if start < cursor:
+                continue  # Overlaps a replacement already made
+            end = start + length
+            parts.append(text[cursor:start])
+            parts.append(replacement)
+            replaced.append(text[start:end])
+            inserted.append(replacement)
+            cursor = end
+
+            stats[stat_key] += 1
+        parts.append(text[cursor:])
+        corrected_text = "".join(parts)
+
+        # Final validation of markdown structure. Text outside the matches is
+        # unchanged, so comparing the replaced spans with their replacements is
+        # equivalent to comparing the whole strings, at a fraction of the scan.
+        if not self._validate_markdown_structure("".join(replaced), "".join(inserted)):
             self.logger.warning("Validation failed; reverting to original text.")
-            return text, dict.fromkeys(stats, 0)
+            return text, self._empty_stats()
 
         return corrected_text, stats
 
+    def _process_text(self, text):
+        """
+        Applies safe grammar corrections to a single string.
+        """
+        if not self.tool:
+            self.logger.debug(
+                "Skipping grammar corrections; LanguageTool disabled.",
+                extra={"event": "language_tool_skipped"},
+            )
+            return text, self._empty_stats()
+
+        if not needs_rule_check(text):
+            return text, self._empty_stats()
+
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        matches = self._check_batch([text])[0]
+        result = self._apply_matches(text, matches)
+        if matches is not None:
+            self._cache.put(text, result)
+        return result
+
     def process(self, data):
         """
         Processes text blocks from the data dictionary, applying safe grammar corrections.
@@ -127,23 +196,55 @@ class GrammarCorrectionFilterSafe:
         if "text_blocks" not in data:
             return data, {}
 
-        total_stats = {
-            "typos_fixed": 0,
-            "punctuation_fixed": 0,
-            "spacing_fixed": 0,
-            "casing_fixed": 0,
-            "simple_agreement_fixed": 0,
-        }
-
-        for block in data.get("text_blocks", []):
-            original_content = block.get("content", "")
-            if not original_content:
-                continue
+        total_stats = self._empty_stats()
 
-            corrected_content, block_stats = self._process_text(original_content)
+        if not self.tool:
+            self.logger.debug(
+                "Skipping grammar corrections; LanguageTool disabled.",
+                extra={"event": "language_tool_skipped"},
+            )
+            return data, total_stats
+
+        blocks = [block for block in data.get("text_blocks", []) if block.get("content", "")]
+
+        # Repeated blocks, within this document or from earlier ones, are checked once
+        results = {}
+        pending = []
+        for block in blocks:
+            text = block["content"]
+            if text in results:
+                continue
+            if not needs_rule_check(text):
+                # Nothing the safe rules could fix; skip the LanguageTool round trip
+                results[text] = (text, self._empty_stats())
+                continue
+            results[text] = self._cache.get(text)
+            if results[text] is None:
+                pending.append(text)
+
+        # One LanguageTool request per batch of blocks rather than per block
+        batches = []
+        size = 0
+        for text in pending:
+            if not batches or size + len(text) > self.MAX_BATCH_CHARS:
+                batches.append([])
+                size = 0
+            batches[-1].append(text)
+            size += len(text) + len(self.BATCH_SEPARATOR)
+
+        for batch in batches:
+            for text, matches in zip(batch, self._check_batch(batch), strict=True):
+                results[text] = self._apply_matches(text, matches)
+                if matches is not None:
+                    self._cache.put(text, results[text])
+
+        for block in blocks:
+            corrected_content, block_stats = results[block["content"]]
             block["content"] = corrected_content
 
-            for key in total_stats:
-                total_stats[key] += block_stats.get(key, 0)
+            # Most blocks need no fixes; only add up the ones that had some
+            if any(block_stats.values()):
+                for key in total_stats:
+                    total_stats[key] += block_stats.get(key, 0)
 
         return data, total_stats
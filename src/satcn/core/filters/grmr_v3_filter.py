@@ -12,13 +12,24 @@ Runtime: llama-cpp-python bindings
 Context window: 4096 tokens (vs T5's 512)
 """
 
+import ctypes
+import gc
+import inspect
 import logging
 import os
+import re
+import stat
 import sys
 import time
+import weakref
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+from satcn.core.utils.content_cache import ContentCache
+from satcn.core.utils.llama_utils import BatchContext, generate_batch, llama_params
+from satcn.core.utils.prefilter import looks_clean
+
 try:
     from llama_cpp import Llama
 
@@ -27,6 +38,63 @@ except ImportError:
     LLAMA_CPP_AVAILABLE = False
     Llama = None
 
+# Whether this llama-cpp-python build accepts n_gpu_layers, checked once at import
+_LLAMA_HAS_GPU_PARAM = (
+    LLAMA_CPP_AVAILABLE and "n_gpu_layers" in inspect.signature(Llama.__init__).parameters
+)
+
+
+GGUF_MAGIC = b"GGUF"
+
+# Whitespace after sentence-ending punctuation, where long blocks are split
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Saved llama.cpp state after prefilling each prompt prefix, per loaded model. Models
+# from _load_llama are shared by filters with the same settings, so the states
+# belong to the model rather than to any one filter.
+_prefix_states: "weakref.WeakKeyDictionary[Any, dict[str, tuple[list[int], Any]]]" = (
+    weakref.WeakKeyDictionary()
+)
+# Prefixes remembered per model; each state holds the prefix's KV cache
+_MAX_PREFIX_STATES = 4
+
+# Resolved model paths by (explicit path, file name, env var, cwd); misses are not cached
+_model_paths: dict[tuple[str | None, str, str | None, str], Path] = {}
+
+
+def _st_mode(path: str | Path) -> int:
+    """Return the file mode of ``path`` from a single stat call, or 0 if it is missing."""
+    try:
+        return os.stat(path).st_mode
+    except (OSError, ValueError):
+        return 0
+
+
+@lru_cache(maxsize=1)
+def _cuda_available() -> bool:
+    """
+    Report whether a CUDA device is usable, probing once per process.
+
+    torch takes seconds to import, so it is only asked when something has
+    already imported it. Otherwise the CUDA driver library is loaded directly
+    and asked for its device count.
+
+    Returns:
+        True if at least one CUDA device is present
+    """
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        return torch.cuda.is_available()
+
+    try:
+        libcuda = ctypes.CDLL("nvcuda.dll" if sys.platform == "win32" else "libcuda.so.1")
+    except OSError:
+        return False
+    count = ctypes.c_int(0)
+    if libcuda.cuInit(0) != 0 or libcuda.cuDeviceGetCount(ctypes.byref(count)) != 0:
+        return False
+    return count.value > 0
+
 
 def find_model_path(
     explicit_path: str | Path | None = None,
@@ -44,6 +112,11 @@ def find_model_path(
     6. User config directory: ~/.satcn/models/
     7. Package installation directory
 
+    A found path is remembered for the same arguments, environment variable and
+    working directory, and re-checked with one stat on later calls instead of
+    searching again. A failed search is not remembered, so a model downloaded
+    afterwards is picked up.
+
     Args:
         explicit_path: Explicitly provided model path
         model_filename: Name of the model file to search for
@@ -51,40 +124,57 @@ def find_model_path(
     Returns:
         Path to the model file if found, None otherwise
     """
+    key = (
+        str(explicit_path) if explicit_path else None,
+        model_filename,
+        os.environ.get("SATCN_GRMR_MODEL_PATH"),
+        os.getcwd(),
+    )
+    cached = _model_paths.get(key)
+    if cached is not None and stat.S_ISREG(_st_mode(cached)):
+        return cached
+
+    path = _search_model_path(explicit_path, model_filename)
+    if path is not None:
+        _model_paths[key] = path
+    return path
+
+
+def _search_model_path(explicit_path: str | Path | None, model_filename: str) -> Path | None:
+    """Walk the locations listed in find_model_path, statting each candidate once."""
     search_paths = []
 
     # 1. Explicit path
     if explicit_path:
         explicit = Path(explicit_path)
-        if explicit.is_file():
+        mode = _st_mode(explicit)
+        if stat.S_ISREG(mode):
             return explicit
         # If explicit path is a directory, look for the model file inside
-        if explicit.is_dir():
+        if stat.S_ISDIR(mode):
             search_paths.append(explicit / model_filename)
 
     # 2. Environment variable
     env_path = os.environ.get("SATCN_GRMR_MODEL_PATH")
     if env_path:
         env_path_obj = Path(env_path)
-        if env_path_obj.is_file():
+        mode = _st_mode(env_path_obj)
+        if stat.S_ISREG(mode):
             return env_path_obj
-        if env_path_obj.is_dir():
+        if stat.S_ISDIR(mode):
             search_paths.append(env_path_obj / model_filename)
 
     # 3. Config file
     config_path = Path.home() / ".satcn" / "llm_gui_config.json"
-    if config_path.exists():
-        try:
-            import json
+    try:
+        import json
 
-            with open(config_path) as f:
-                config = json.load(f)
-                if config.get("model_path"):
-                    config_model_path = Path(config["model_path"])
-                    if config_model_path.exists():
-                        search_paths.append(config_model_path)
-        except Exception:
-            pass  # Ignore config parsing errors
+        with open(config_path) as f:
+            config = json.load(f)
+            if config.get("model_path"):
+                search_paths.append(Path(config["model_path"]))
+    except Exception:
+        pass  # Ignore a missing config file or parsing errors
 
     # 4. Virtual environment directory
     # Check if we're in a virtual environment
@@ -111,12 +201,42 @@ def find_model_path(
 
     # Search all paths
     for path in search_paths:
-        if path.exists() and path.is_file():
+        if stat.S_ISREG(_st_mode(path)):
             return path
 
     return None
 
 
+@lru_cache(maxsize=2)
+def _load_llama(model_path: str, params: tuple[tuple[str, Any], ...]) -> "Llama":
+    """
+    Load a GGUF model, reusing the instance from an earlier identical load.
+
+    Filters built repeatedly in one process (GUI reruns, pipeline runs,
+    benchmarks) share one mmap'd model and one GPU copy instead of loading
+    it again. At most one CPU and one GPU configuration stay resident.
+
+    Args:
+        model_path: Path to the .gguf model file
+        params: ``Llama`` keyword arguments as sorted ``(name, value)`` pairs
+
+    Returns:
+        The loaded ``Llama`` instance
+    """
+    return Llama(model_path=model_path, **dict(params))
+
+
+def clear_model_cache() -> None:
+    """
+    Drop cached ``Llama`` instances so their memory can be released.
+
+    Models still referenced by a live filter stay loaded until that filter
+    is deleted.
+    """
+    _load_llama.cache_clear()
+    gc.collect()
+
+
 class GRMRV3GrammarFilter:
     """
     A filter that uses a local GGUF model for grammar and spelling correction.
@@ -144,9 +264,14 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
 ### Response
 """
 
+    # Blocks estimated above this many tokens are corrected in sentence groups of
+    # about this size, which keeps each response well inside max_new_tokens
+    CHUNK_TOKENS = 200
+
     def __init__(
         self,
         model_path: str | None = None,
+        model_filename: str = "GRMR-V3-Q4B.Q4_K_M.gguf",
         n_ctx: int = 4096,
         max_new_tokens: int = 256,
         temperature: float = 0.1,
@@ -157,6 +282,16 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
         frequency_penalty: float = 0.0,
         presence_penalty: float = 0.0,
         device: str | None = None,
+        n_gpu_layers: int | None = None,
+        n_batch: int | None = None,
+        n_ubatch: int | None = None,
+        flash_attn: bool | None = None,
+        n_threads: int | None = None,
+        n_parallel: int = 1,
+        use_mlock: bool = False,
+        cache_size: int = 4096,
+        skip_clean: bool = False,
+        llama_overrides: dict[str, Any] | None = None,
         logger: logging.Logger | None = None,
     ):
         """
@@ -167,6 +302,13 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
 
         Args:
             model_path: Path to the .gguf model file. If not provided, searches multiple locations automatically.
+            model_filename: Model file name looked for in the search locations, to pick
+                another quantization of GRMR-V3 (default: GRMR-V3-Q4B.Q4_K_M.gguf):
+                - Q4_K_M (~2.5GB): smallest and fastest on GPU; the default
+                - Q5_K_M: often as fast as Q4_K_M on AVX-512 CPUs, with fewer
+                  marginal corrections
+                - Q8_0 (~4.3GB): closest to full precision; usually the fastest on
+                  CPUs without native 4-bit kernels, but needs the most memory
             n_ctx: Context window size (default: 4096 tokens)
             max_new_tokens: Maximum tokens to generate per correction (default: 256)
             temperature: Sampling temperature - 0.1 for deterministic (default: 0.1)
@@ -177,6 +319,28 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             frequency_penalty: Frequency penalty (default: 0.0)
             presence_penalty: Presence penalty (default: 0.0)
             device: Device to use ('cuda', 'cpu', or None for auto-detect)
+            n_gpu_layers: Layers to offload (default: all on CUDA, none on CPU)
+            n_batch: Prompt tokens evaluated per llama.cpp batch (default: tuned per device)
+            n_ubatch: Tokens per physical micro-batch each n_batch is split into;
+                larger values speed up GPU prefill at the cost of a bigger compute
+                buffer (default: llama.cpp's 512)
+            flash_attn: Use llama.cpp's fused flash attention kernel (default: on
+                for CUDA, off on CPU)
+            n_threads: CPU threads for llama.cpp decode and prefill (default: physical
+                cores on CPU)
+            n_parallel: Blocks decoded together as separate sequences by process().
+                Batched decoding is greedy and ignores the sampling settings above,
+                so it is opt-in; 1 corrects blocks one at a time through
+                correct_text. Batches decode in a second llama.cpp context, allocated
+                once per process() call (default: 1)
+            use_mlock: Pin the whole model in RAM instead of letting the OS page the
+                memory-mapped file in and out (default: False)
+            cache_size: Corrections remembered by text, so repeated blocks skip the
+                model; kept across process() calls, 0 disables (default: 4096)
+            skip_clean: Return short texts with no spelling or punctuation problems
+                unchanged without calling the model (default: False)
+            llama_overrides: Extra or overriding ``Llama`` keyword arguments, e.g.
+                flash attention or a quantized KV cache (default: None)
             logger: Logger instance (creates one if not provided)
         """
         self.logger = logger or logging.getLogger(__name__)
@@ -190,7 +354,7 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             )
 
         # Resolve model path using smart search
-        resolved_path = find_model_path(explicit_path=model_path)
+        resolved_path = find_model_path(explicit_path=model_path, model_filename=model_filename)
 
         if resolved_path is None:
             # Provide helpful error message with search locations
@@ -204,7 +368,7 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
                 "7. Package install directory",
             ]
             error_msg = (
-                f"GGUF model file not found.\n\n"
+                f"GGUF model file {model_filename} not found.\n\n"
                 f"Searched the following locations:\n" + "\n".join(search_locations) + "\n\n"
                 f"Solutions:\n"
                 f"  • Download the model and place it in one of the locations above\n"
@@ -219,6 +383,17 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
         self.model_path = resolved_path
         self.logger.info(f"Using model at: {self.model_path}")
 
+        # A truncated or mislabeled download otherwise only fails partway into a
+        # multi-second llama.cpp load; the 4-byte magic identifies it immediately
+        with open(self.model_path, "rb") as f:
+            magic = f.read(4)
+        if magic != GGUF_MAGIC:
+            raise ValueError(
+                f"{self.model_path} is not a GGUF model file (header {magic!r}, "
+                f"expected {GGUF_MAGIC!r}). The download may be corrupt or incomplete; "
+                f"delete it and download the model again."
+            )
+
         # Store generation parameters (following GRMR-V3-G4B model card recommendations)
         self.n_ctx = n_ctx
         self.max_new_tokens = max_new_tokens
@@ -229,6 +404,10 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
         self.repeat_penalty = repeat_penalty
         self.frequency_penalty = frequency_penalty
         self.presence_penalty = presence_penalty
+        self.skip_clean = skip_clean
+        self.n_parallel = n_parallel
+        self.use_mlock = use_mlock
+        self._cache = ContentCache(cache_size)
 
         # Determine GPU layers based on device
         if device is None:
@@ -236,32 +415,17 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             use_gpu = False
 
             # First, check if llama-cpp-python has GPU support by inspecting parameters
-            import inspect
-
-            llama_sig = inspect.signature(Llama.__init__)
-            has_gpu_param = "n_gpu_layers" in llama_sig.parameters
-
-            if has_gpu_param:
+            if _LLAMA_HAS_GPU_PARAM:
                 self.logger.info(
                     "llama-cpp-python has n_gpu_layers parameter - CUDA build detected"
                 )
 
                 # Check if CUDA is actually available
-                try:
-                    import torch
-
-                    if torch.cuda.is_available():
-                        use_gpu = True
-                        self.logger.info(f"PyTorch CUDA available: {torch.cuda.get_device_name(0)}")
-                    else:
-                        self.logger.warning("PyTorch CUDA not available - falling back to CPU")
-                except ImportError:
-                    # PyTorch not installed, but llama-cpp-python may still have CUDA
-                    # Try to use GPU anyway - llama-cpp will report if it fails
+                if _cuda_available():
                     use_gpu = True
-                    self.logger.info(
-                        "PyTorch not installed - attempting GPU via llama-cpp-python CUDA"
-                    )
+                    self.logger.info("CUDA device available")
+                else:
+                    self.logger.warning("No CUDA device available - falling back to CPU")
             else:
                 self.logger.warning(
                     "llama-cpp-python built without GPU support (missing n_gpu_layers parameter)"
@@ -273,7 +437,8 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             device = "cuda" if use_gpu else "cpu"
 
         self.device = device
-        n_gpu_layers = -1 if device == "cuda" else 0
+        if n_gpu_layers is None:
+            n_gpu_layers = -1 if device == "cuda" else 0
 
         if device == "cuda":
             self.logger.info(
@@ -290,17 +455,38 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             self.logger.info(f"Loading GRMR-V3 GGUF model from {self.model_path}")
             start_time = time.time()
 
-            self.llm = Llama(
-                model_path=str(self.model_path),
-                n_ctx=n_ctx,
-                n_gpu_layers=n_gpu_layers,
-                use_mlock=True,  # Lock model in RAM for better performance
-                use_mmap=True,  # Memory-map the model file
-                verbose=True,  # Enable verbose to see GPU usage logs
-            )
+            params = {
+                "n_ctx": n_ctx,
+                "n_gpu_layers": n_gpu_layers,
+                # Tuned n_batch/threads/KV offload; the model is memory-mapped
+                **llama_params(gpu=device == "cuda"),
+                "use_mlock": use_mlock,
+                "verbose": True,  # Enable verbose to see GPU usage logs
+            }
+            if n_batch is not None:
+                params["n_batch"] = n_batch
+            if n_ubatch is not None:
+                params["n_ubatch"] = n_ubatch
+            if flash_attn is not None:
+                params["flash_attn"] = flash_attn
+            if n_threads is not None:
+                params["n_threads"] = params["n_threads_batch"] = n_threads
+            params.update(llama_overrides or {})
+            try:
+                self.llm = _load_llama(str(self.model_path), tuple(sorted(params.items())))
+            except TypeError:
+                # Unhashable overrides (e.g. a tensor_split list) cannot be cached
+                self.llm = Llama(model_path=str(self.model_path), **params)
 
             load_time = time.time() - start_time
             self.logger.info(f"GRMR-V3 model loaded successfully in {load_time:.2f}s")
+            self.logger.info(
+                f"llama.cpp settings: n_batch={params.get('n_batch')}, "
+                f"n_ubatch={params.get('n_ubatch', 'default')}, "
+                f"flash_attn={params.get('flash_attn', False)}, "
+                f"offload_kqv={params.get('offload_kqv', False)}, "
+                f"n_threads={params.get('n_threads', 'default')}"
+            )
 
             # Verify GPU usage
             if device == "cuda":
@@ -318,12 +504,24 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             self.logger.error(f"Failed to load GRMR-V3 model: {e}")
             raise
 
+        # Prefill the instruction header while loading, so even the first block
+        # only pays prompt evaluation for its own text and the response marker
+        self._prompt_header = self.PROMPT_TEMPLATE.split("{text}")[0]
+        try:
+            self._prime_prefix(self._prompt_header)
+        except Exception as e:
+            # Only an optimization; correct_text primes the header again if needed
+            self.reset_prefix_cache()
+            self.logger.warning(f"Could not prefill the GRMR-V3 instruction header: {e}")
+
         # Statistics tracking
         self.stats = {
             "corrections_made": 0,
             "total_blocks_processed": 0,
             "total_tokens_generated": 0,
             "total_duration_ms": 0,
+            "skipped": 0,
+            "cache_hits": 0,
         }
 
     def _build_prompt(self, text: str) -> str:
@@ -338,12 +536,103 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
         """
         return self.PROMPT_TEMPLATE.format(text=text)
 
-    def correct_text(self, text: str) -> str:
+    def tokenize_len(self, text: str) -> int:
+        """
+        Count the model tokens in a text.
+
+        Args:
+            text: Text to measure
+
+        Returns:
+            Number of tokens, excluding the BOS token
+        """
+        return len(self.llm.tokenize(text.encode("utf-8"), add_bos=False))
+
+    def _split_for_correction(self, text: str) -> list[tuple[str, str]]:
+        """
+        Split a long text into groups of whole sentences of about CHUNK_TOKENS.
+
+        A sentence longer than CHUNK_TOKENS forms a group of its own.
+
+        Args:
+            text: Input text to split
+
+        Returns:
+            (sentence group, whitespace that followed it) pairs, which
+            concatenate back to ``text``
+        """
+        groups: list[tuple[str, str]] = []
+        start = 0
+        for match in [*_SENTENCE_END_RE.finditer(text), None]:
+            sentence = text[start : match.start()] if match else text[start:]
+            separator = match.group() if match else ""
+            start = match.end() if match else len(text)
+            if groups and not sentence:
+                # Only whitespace follows: it becomes the last group's separator
+                groups[-1] = (groups[-1][0], groups[-1][1] + separator)
+            elif groups and (len(groups[-1][0]) + len(groups[-1][1]) + len(sentence)) // 4 <= (
+                self.CHUNK_TOKENS
+            ):
+                groups[-1] = (groups[-1][0] + groups[-1][1] + sentence, separator)
+            else:
+                groups.append((sentence, separator))
+        return groups
+
+    def _prime_prefix(self, prefix: str) -> None:
+        """
+        Put the KV cache for ``prefix`` in place before a completion.
+
+        llama.cpp skips prefill for the leading tokens a prompt shares with the
+        tokens already in the context, so a prefix that is still loaded costs
+        nothing. Once other prompts have replaced it, the state saved after its
+        first prefill is restored instead of evaluating the prefix again.
+
+        The saved states are kept per model, so filters sharing a model (and
+        its context) also share prefixes, and a generation by one of them is
+        noticed by the others through the context's tokens.
+
+        Args:
+            prefix: Leading prompt text shared by consecutive calls
+        """
+        states = _prefix_states.setdefault(self.llm, {})
+        saved = states.get(prefix)
+        if saved is not None:
+            tokens, state = saved
+            n_prefix = len(tokens)
+            loaded = self.llm.n_tokens >= n_prefix and (
+                list(self.llm.input_ids[:n_prefix]) == tokens
+            )
+            if not loaded:
+                self.llm.load_state(state)
+            return
+
+        tokens = self.llm.tokenize(prefix.encode("utf-8"), special=True)
+        self.llm.reset()
+        self.llm.eval(tokens)
+        if len(states) >= _MAX_PREFIX_STATES:
+            del states[next(iter(states))]  # Oldest first
+        states[prefix] = (tokens, self.llm.save_state())
+
+    def reset_prefix_cache(self) -> None:
+        """
+        Drop the saved prompt-prefix states of this filter's model.
+
+        The next correction prefills its prefix again, e.g. to time a cold run.
+        """
+        _prefix_states.pop(self.llm, None)
+
+    def correct_text(self, text: str, prompt_prefix: str | None = None) -> str:
         """
         Correct a single text string using the GRMR-V3 model.
 
         Args:
             text: Input text to correct
+            prompt_prefix: Optional context shared by consecutive calls (chapter
+                header, speaker tag) placed before the prompt. Like the
+                instruction header, its KV cache is computed once and reused, so
+                only the text and response marker are prefilled per call. End
+                it with a newline so it tokenizes the same alone and as part of
+                the full prompt.
 
         Returns:
             Corrected text
@@ -351,9 +640,29 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
         if not text or len(text.strip()) == 0:
             return text
 
+        if len(text) // 4 > self.CHUNK_TOKENS:
+            chunks = self._split_for_correction(text)
+            if len(chunks) > 1:
+                return "".join(
+                    self.correct_text(chunk, prompt_prefix) + separator
+                    for chunk, separator in chunks
+                )
+
+        if self.skip_clean and looks_clean(text):
+            self.stats["skipped"] += 1
+            return text
+
+        cache_key = f"{prompt_prefix}\x00{text}" if prompt_prefix else text
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
         try:
-            # Build prompt
-            prompt = self._build_prompt(text)
+            # Build prompt; everything up to the text is the same on every call
+            prompt_prefix = prompt_prefix or ""
+            self._prime_prefix(prompt_prefix + self._prompt_header)
+            prompt = prompt_prefix + self._build_prompt(text)
 
             # Check context length
             # Rough estimate: 1 token ≈ 4 characters
@@ -364,8 +673,9 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
                     f"Consider splitting into smaller chunks."
                 )
 
-            # Generate correction with deterministic parameters
-            start_time = time.time()
+            # Generate correction with deterministic parameters. perf_counter is
+            # monotonic, so wall-clock adjustments cannot skew the timings.
+            start_time = time.perf_counter()
 
             response = self.llm(
                 prompt,
@@ -381,7 +691,7 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
                 echo=False,  # Don't echo the prompt
             )
 
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000
 
             # Extract corrected text
             corrected = response["choices"][0]["text"].strip()
@@ -391,12 +701,14 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             self.stats["total_tokens_generated"] += tokens_generated
             self.stats["total_duration_ms"] += duration_ms
 
-            # Log performance
-            self.logger.debug(
-                f"Corrected {len(text)} chars -> {len(corrected)} chars "
-                f"({tokens_generated} tokens, {duration_ms:.0f}ms)"
-            )
+            # Log performance; skip building the message when debug is off
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    f"Corrected {len(text)} chars -> {len(corrected)} chars "
+                    f"({tokens_generated} tokens, {duration_ms:.0f}ms)"
+                )
 
+            self._cache.put(cache_key, corrected)
             return corrected
 
         except Exception as e:
@@ -404,6 +716,121 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             # Return original text on error
             return text
 
+    def correct_text_batch(
+        self, texts: list[str], context: BatchContext | None = None
+    ) -> list[str]:
+        """
+        Correct several text strings in one batched decode.
+
+        All texts are prefilled together, share one copy of the instruction
+        prefix, and advance one token per decode step, instead of running a
+        separate generation per text. Decoding is greedy (see generate_batch).
+        Repeated texts are generated once, and previously corrected texts are
+        served from the cache. Long texts are split into sentence groups that
+        are decoded alongside the other texts.
+
+        Args:
+            texts: Input texts to correct
+            context: Batch context to decode in, reused across calls (default: one
+                allocated and freed for this call)
+
+        Returns:
+            Corrected texts, in input order
+        """
+        split = [
+            self._split_for_correction(text) if len(text) // 4 > self.CHUNK_TOKENS else None
+            for text in texts
+        ]
+        if any(chunks and len(chunks) > 1 for chunks in split):
+            flat = []
+            for text, chunks in zip(texts, split, strict=True):
+                if chunks:
+                    flat.extend(chunk for chunk, _ in chunks)
+                else:
+                    flat.append(text)
+            outputs = iter(self.correct_text_batch(flat, context=context))
+            return [
+                "".join(next(outputs) + separator for _, separator in chunks)
+                if chunks
+                else next(outputs)
+                for chunks in split
+            ]
+
+        corrected = list(texts)
+        # Texts still to generate, each mapped to the positions it occurs at
+        pending: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            if not text or len(text.strip()) == 0:
+                continue
+            if self.skip_clean and looks_clean(text):
+                self.stats["skipped"] += 1
+                continue
+            cached = self._cache.get(text)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                corrected[i] = cached
+                continue
+            pending.setdefault(text, []).append(i)
+
+        if not pending:
+            return corrected
+
+        todo = list(pending)
+        prefix, footer = self.PROMPT_TEMPLATE.split("{text}")
+        try:
+            start_time = time.perf_counter()
+            outputs = generate_batch(
+                self.llm,
+                [text + footer for text in todo],
+                max_tokens=self.max_new_tokens,
+                stop=["###", "\n\n\n"],
+                prefix=prefix,
+                context=context,
+            )
+            self.stats["total_duration_ms"] += (time.perf_counter() - start_time) * 1000
+            self.stats["total_tokens_generated"] += sum(map(self.tokenize_len, outputs))
+            outputs = [output.strip() or text for text, output in zip(todo, outputs, strict=True)]
+            for text, output in zip(todo, outputs, strict=True):
+                self._cache.put(text, output)
+        except Exception as e:
+            self.logger.error(f"Batched GRMR-V3 correction failed, retrying one by one: {e}")
+            outputs = [self.correct_text(text).strip() or text for text in todo]
+
+        for text, output in zip(todo, outputs, strict=True):
+            for i in pending[text]:
+                corrected[i] = output
+
+        return corrected
+
+    def batch_correct(self, texts: list[str]) -> list[str]:
+        """
+        Correct any number of text strings, n_parallel at a time.
+
+        Texts are sorted by length and decoded in batches of up to n_parallel
+        sequences (see correct_text_batch), so a batch does not wait on one
+        long generation. All batches share one llama.cpp batch context, so its KV
+        cache is allocated once per call rather than once per batch. With
+        n_parallel=1 each text goes through correct_text.
+
+        Args:
+            texts: Input texts to correct
+
+        Returns:
+            Corrected texts, in input order
+        """
+        if self.n_parallel <= 1:
+            return [self.correct_text(text) for text in texts]
+
+        corrected = list(texts)
+        order = sorted(range(len(texts)), key=lambda k: len(texts[k]))
+        with BatchContext(self.llm) as context:
+            for start in range(0, len(order), self.n_parallel):
+                chunk = order[start : start + self.n_parallel]
+                outputs = self.correct_text_batch([texts[k] for k in chunk], context=context)
+                for k, output in zip(chunk, outputs, strict=True):
+                    corrected[k] = output
+        return corrected
+
     def process(self, data: dict[str, Any]) -> dict[str, Any]:
         """
         Process pipeline data, correcting grammar in each text block.
@@ -419,24 +846,30 @@ You are a copy editor. Fix grammar, spelling, and punctuation while keeping char
             return data
 
         corrections_made = 0
-        blocks_processed = 0
 
-        for i, block in enumerate(data["text_blocks"]):
-            original_content = block.get("content", "")
+        blocks = [
+            (i, block)
+            for i, block in enumerate(data["text_blocks"])
+            if block.get("content", "") and len(block["content"].strip()) > 0
+        ]
+        blocks_processed = len(blocks)
+        contents = [block["content"] for _, block in blocks]
 
-            if not original_content or len(original_content.strip()) == 0:
-                continue
-
-            blocks_processed += 1
+        corrected = self.batch_correct(contents)
 
-            # Correct the text
-            corrected_content = self.correct_text(original_content)
+        for (i, block), corrected_content in zip(blocks, corrected, strict=True):
+            original_content = block["content"]
 
             # Update block if changed
             if corrected_content != original_content:
                 block["content"] = corrected_content
                 corrections_made += 1
 
+                # Word counts are only reported at debug level; skip splitting
+                # both strings otherwise
+                if not self.logger.isEnabledFor(logging.DEBUG):
+                    continue
+
                 # Calculate word-level changes
                 original_words = len(original_content.split())
                 corrected_words = len(corrected_content.split())
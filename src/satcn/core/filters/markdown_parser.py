@@ -63,7 +63,14 @@ class MarkdownParserFilter:
     data structure for subsequent processing.
     """
 
-    def __init__(self):
+    def __init__(self, buffer=None):
+        """
+        Args:
+            buffer: Already-opened file contents (bytes or a read-only mmap) to
+                parse instead of opening the file again. The file path is then
+                only used to name the output.
+        """
+        self.buffer = buffer
         self.md_ext = _MarkdownExtractionExtension()
         self.md = markdown.Markdown(extensions=[self.md_ext])
 
@@ -73,8 +80,11 @@ class MarkdownParserFilter:
         extracted text blocks and the parsed tree.
         """
         try:
-            with open(filepath, encoding="utf-8") as f:
-                content = f.read()
+            if self.buffer is not None:
+                content = bytes(self.buffer).decode("utf-8")
+            else:
+                with open(filepath, encoding="utf-8") as f:
+                    content = f.read()
 
             # Reset the markdown instance to clear state from previous runs
             self.md.reset()
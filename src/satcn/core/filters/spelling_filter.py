@@ -1,18 +1,96 @@
 # pipeline/filters/spelling_filter.py
 
+import importlib.resources
 import re
+from functools import lru_cache
 
 from spellchecker import SpellChecker
 
+try:
+    from symspellpy import SymSpell, Verbosity
+
+    SYMSPELL_AVAILABLE = True
+except ImportError:
+    SYMSPELL_AVAILABLE = False
+
+# Whole words, as looked up in and replaced from the spelling dictionary
+_WORD_RE = re.compile(r"\b\w+\b")
+
+
+@lru_cache(maxsize=1)
+def _load_symspell(max_edit_distance):
+    """
+    Build a SymSpell index over symspellpy's bundled English frequency list.
+
+    Precomputing the deletes takes a couple of seconds, so the index is built
+    once per process and shared by every filter instance.
+    """
+    sym = SymSpell(max_dictionary_edit_distance=max_edit_distance, prefix_length=7)
+    dictionary = importlib.resources.files("symspellpy") / "frequency_dictionary_en_82_765.txt"
+    with importlib.resources.as_file(dictionary) as path:
+        sym.load_dictionary(str(path), term_index=0, count_index=1)
+    return sym
+
+
+class _SymSpellChecker:
+    """
+    SymSpell behind the two SpellChecker methods the filter uses.
+
+    Symmetric-delete lookup finds candidates with a few dict probes instead
+    of generating every edit of the word, as pyspellchecker does in Python.
+    """
+
+    def __init__(self, max_edit_distance=2):
+        self.max_edit_distance = max_edit_distance
+        self.sym = _load_symspell(max_edit_distance)
+
+    def unknown(self, words):
+        """Return the words not in the dictionary, skipping numbers like SpellChecker."""
+        unknown = set()
+        for word in words:
+            if word in self.sym.words:
+                continue
+            try:
+                float(word)
+            except ValueError:
+                unknown.add(word)
+        return unknown
+
+    def correction(self, word):
+        """Return the most frequent closest dictionary word, or None if there is none."""
+        suggestions = self.sym.lookup(word, Verbosity.TOP, max_edit_distance=self.max_edit_distance)
+        return suggestions[0].term if suggestions else None
+
 
 class SpellingCorrectionFilter:
     """
     A filter that corrects spelling in the text blocks provided in the data.
     """
 
-    def __init__(self):
-        # Initialize SpellChecker for English
-        self.spell = SpellChecker()
+    def __init__(self, backend="pyspellchecker"):
+        """
+        Args:
+            backend (str): "pyspellchecker" (the default) for the pure-Python
+                edit enumeration, "symspell" for symspellpy's faster
+                symmetric-delete lookup (pip install satcn[spell-fast]), or
+                "auto" to use symspell when it is installed. The backends use
+                different dictionaries, so they can pick different corrections.
+        """
+        if backend == "auto":
+            backend = "symspell" if SYMSPELL_AVAILABLE else "pyspellchecker"
+        if backend not in ("symspell", "pyspellchecker"):
+            raise ValueError(
+                f"Unknown spelling backend {backend!r}; expected 'auto', 'symspell' or "
+                f"'pyspellchecker'"
+            )
+        if backend == "symspell" and not SYMSPELL_AVAILABLE:
+            raise ImportError(
+                "symspellpy is not installed. Install it with: pip install satcn[spell-fast]"
+            )
+        self.backend = backend
+
+        # Initialize the spell checker for English
+        self.spell = _SymSpellChecker() if backend == "symspell" else SpellChecker()
 
     def process(self, data):
         """
@@ -21,31 +99,38 @@ class SpellingCorrectionFilter:
         if "text_blocks" not in data:
             return data
 
-        for block in data["text_blocks"]:
-            original_content = block.get("content", "")
-            if not original_content:
-                continue
-
+        # Look up each distinct word once for the whole document, rather than
+        # once per block it appears in
+        blocks = [block for block in data["text_blocks"] if block.get("content", "")]
+        block_words = [
             # Use a regex to split the text into words and handle punctuation
-            words = re.findall(r"\b\w+\b", original_content.lower())
-
-            # Find which words are misspelled
-            misspelled = self.spell.unknown(words)
-
-            corrected_content = original_content
-            for word in misspelled:
-                # Get the most likely correction
-                correction = self.spell.correction(word)
-                if correction and correction != word:
-                    # Use regex to replace the misspelled word, ignoring case
-                    # The \b ensures we match whole words only
-                    corrected_content = re.sub(
-                        r"\b" + re.escape(word) + r"\b",
-                        correction,
-                        corrected_content,
-                        flags=re.IGNORECASE,
-                    )
-
-            block["content"] = corrected_content
+            set(_WORD_RE.findall(block["content"].lower()))
+            for block in blocks
+        ]
+
+        # Find which words are misspelled
+        misspelled = self.spell.unknown(set().union(*block_words))
+
+        corrections = {}
+        for word in misspelled:
+            # Get the most likely correction
+            correction = self.spell.correction(word)
+            if correction and correction != word:
+                corrections[word] = correction
+
+        if not corrections:
+            return data
+
+        def replace(match):
+            word = match.group()
+            return corrections.get(word.lower(), word)
+
+        # Bound once rather than looked up for every block
+        substitute = _WORD_RE.sub
+        for block, words in zip(blocks, block_words, strict=True):
+            if not words.isdisjoint(corrections):
+                # Replace every misspelled word, in any case, in one pass over the
+                # block rather than one regex substitution per word
+                block["content"] = substitute(replace, block["content"])
 
         return data
@@ -25,7 +25,7 @@ class T5CorrectionFilter:
     """
 
     def __init__(
-        self, model_name=None, device=None, max_length=512, num_beams=4, use_half_precision=True
+        self, model_name=None, device=None, max_length=512, num_beams=1, use_half_precision=True
     ):
         """
         Initialize the T5 correction filter.
@@ -34,7 +34,7 @@ class T5CorrectionFilter:
             model_name: T5 model to use (None = default)
             device: Computing device ('cuda', 'cpu', 'mps', or None for auto)
             max_length: Maximum sequence length
-            num_beams: Beam search parameter
+            num_beams: Beam search width (1 = greedy decoding)
             use_half_precision: Use float16 on GPU
         """
         self.logger = logging.getLogger(__name__)
@@ -1,9 +1,10 @@
 import argparse
+import functools
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from satcn.core.filters import GRMR_V3_AVAILABLE, T5_AVAILABLE
 from satcn.core.filters.epub_parser import EpubOutputGenerator, EpubParserFilter
 from satcn.core.filters.grammar_filter_safe import GrammarCorrectionFilterSafe
 from satcn.core.filters.markdown_parser import MarkdownOutputGenerator, MarkdownParserFilter
@@ -11,16 +12,6 @@ from satcn.core.filters.spelling_filter import SpellingCorrectionFilter
 from satcn.core.filters.tts_normalizer import TTSNormalizer
 from satcn.core.utils.logging_setup import setup_logging
 
-# Conditional import for T5
-if T5_AVAILABLE:
-    from satcn.core.filters.t5_correction_filter import T5CorrectionFilter
-else:
-    T5CorrectionFilter = None
-
-# Conditional import for GRMR-V3
-if GRMR_V3_AVAILABLE:
-    from satcn.core.filters.grmr_v3_filter import GRMRV3GrammarFilter
-
 
 class PipelineRunner:
     def __init__(
@@ -32,6 +23,7 @@ class PipelineRunner:
         use_grmr=False,
         grmr_mode="replace",
         grmr_model_path=None,
+        input_buffer=None,
     ):
         """
         Initialize the SATCN pipeline runner.
@@ -47,6 +39,8 @@ class PipelineRunner:
             use_grmr: Enable GRMR-V3 GGUF-based correction (experimental)
             grmr_mode: GRMR-V3 integration mode (same options as T5)
             grmr_model_path: Path to GRMR-V3 model file (optional, auto-detected if not specified)
+            input_buffer: Contents of the input file (bytes or a read-only mmap) if the
+                caller already opened it; the parser then reads it instead of the path
         """
         self.input_filepath = input_filepath
         self.fail_fast = fail_fast
@@ -55,15 +49,20 @@ class PipelineRunner:
         self.use_grmr = use_grmr
         self.grmr_mode = grmr_mode
         self.grmr_model_path = grmr_model_path
+        self.input_buffer = input_buffer
         self.logger = setup_logging()
 
-        # Validate GRMR-V3 availability
-        if self.use_grmr and not GRMR_V3_AVAILABLE:
-            raise RuntimeError(
-                "GRMR-V3 filter requested but llama-cpp-python is not installed.\n"
-                "Install dependencies: pip install -r requirements-grmr.txt\n"
-                "See docs/GRMR_V3_INSTALLATION_NOTES.md for details."
-            )
+        # Validate GRMR-V3 availability. Model-backed filters are imported only when
+        # requested, so importing the runner (and the CLI) does not pull in llama.cpp.
+        if self.use_grmr:
+            from satcn.core.filters import GRMR_V3_AVAILABLE
+
+            if not GRMR_V3_AVAILABLE:
+                raise RuntimeError(
+                    "GRMR-V3 filter requested but llama-cpp-python is not installed.\n"
+                    "Install dependencies: pip install -r requirements-grmr.txt\n"
+                    "See docs/GRMR_V3_INSTALLATION_NOTES.md for details."
+                )
 
         # Don't allow both T5 and GRMR-V3 at the same time (for now)
         if self.use_t5 and self.use_grmr:
@@ -83,20 +82,23 @@ class PipelineRunner:
         """
         _, file_extension = os.path.splitext(self.input_filepath)
         if file_extension.lower() == ".md":
-            parser_filter = MarkdownParserFilter()
+            parser_filter = MarkdownParserFilter(buffer=self.input_buffer)
             output_generator = MarkdownOutputGenerator()
         elif file_extension.lower() == ".epub":
-            parser_filter = EpubParserFilter()
+            parser_filter = EpubParserFilter(buffer=self.input_buffer)
             output_generator = EpubOutputGenerator()
         else:
             raise ValueError(
                 f"Unsupported file type '{file_extension}'. Please provide a .md or .epub file."
             )
 
-        # Build filter pipeline based on configuration
-        filters = [(parser_filter, False)]
+        # Build filter pipeline based on configuration. The correction filters are
+        # listed as (constructor, returns_stats) and constructed concurrently below.
+        correction_filters = []
 
         if self.use_t5:
+            from satcn.core.filters import T5_AVAILABLE, T5CorrectionFilter
+
             if not T5_AVAILABLE:
                 self.logger.error("T5 correction requested but T5 is not available!")
                 self.logger.error("Install T5 dependencies: pip install transformers torch")
@@ -106,60 +108,70 @@ class PipelineRunner:
 
             if self.t5_mode == "replace":
                 # Replace spelling+grammar with T5 only (simplest)
-                filters.append((T5CorrectionFilter(), True))
+                correction_filters.append((T5CorrectionFilter, True))
 
             elif self.t5_mode == "hybrid":
                 # T5 first, then rule-based cleanup
-                filters.append((T5CorrectionFilter(), True))
-                filters.append((SpellingCorrectionFilter(), False))
-                filters.append((GrammarCorrectionFilterSafe(), True))
+                correction_filters.append((T5CorrectionFilter, True))
+                correction_filters.append((SpellingCorrectionFilter, False))
+                correction_filters.append((GrammarCorrectionFilterSafe, True))
 
             elif self.t5_mode == "supplement":
                 # Keep existing filters, add T5 at the end
-                filters.append((SpellingCorrectionFilter(), False))
-                filters.append((GrammarCorrectionFilterSafe(), True))
-                filters.append((T5CorrectionFilter(), True))
+                correction_filters.append((SpellingCorrectionFilter, False))
+                correction_filters.append((GrammarCorrectionFilterSafe, True))
+                correction_filters.append((T5CorrectionFilter, True))
 
             else:
                 raise ValueError(f"Unknown T5 mode: {self.t5_mode}")
 
         elif self.use_grmr:
+            from satcn.core.filters import GRMRV3GrammarFilter
+
             self.logger.info(f"GRMR-V3 correction enabled (mode: {self.grmr_mode})")
+            # GRMR-V3 doesn't return stats tuple
+            grmr_filter = functools.partial(GRMRV3GrammarFilter, model_path=self.grmr_model_path)
 
             if self.grmr_mode == "replace":
                 # Replace spelling+grammar with GRMR-V3 only (simplest)
-                filters.append(
-                    (GRMRV3GrammarFilter(model_path=self.grmr_model_path), False)
-                )  # GRMR-V3 doesn't return stats tuple
+                correction_filters.append((grmr_filter, False))
 
             elif self.grmr_mode == "hybrid":
                 # GRMR-V3 first, then rule-based cleanup
-                filters.append(
-                    (GRMRV3GrammarFilter(model_path=self.grmr_model_path), False)
-                )  # GRMR-V3 doesn't return stats tuple
-                filters.append((SpellingCorrectionFilter(), False))
-                filters.append((GrammarCorrectionFilterSafe(), True))
+                correction_filters.append((grmr_filter, False))
+                correction_filters.append((SpellingCorrectionFilter, False))
+                correction_filters.append((GrammarCorrectionFilterSafe, True))
 
             elif self.grmr_mode == "supplement":
                 # Keep existing filters, add GRMR-V3 at the end
-                filters.append((SpellingCorrectionFilter(), False))
-                filters.append((GrammarCorrectionFilterSafe(), True))
-                filters.append(
-                    (GRMRV3GrammarFilter(model_path=self.grmr_model_path), False)
-                )  # GRMR-V3 doesn't return stats tuple
+                correction_filters.append((SpellingCorrectionFilter, False))
+                correction_filters.append((GrammarCorrectionFilterSafe, True))
+                correction_filters.append((grmr_filter, False))
 
             else:
                 raise ValueError(f"Unknown GRMR-V3 mode: {self.grmr_mode}")
 
         else:
             # Default pipeline (no ML models)
-            filters.extend(
+            correction_filters.extend(
                 [
-                    (SpellingCorrectionFilter(), False),
-                    (GrammarCorrectionFilterSafe(), True),
+                    (SpellingCorrectionFilter, False),
+                    (GrammarCorrectionFilterSafe, True),
                 ]
             )
 
+        # Model loading, the LanguageTool server start-up and the spelling dictionary
+        # load are mostly file I/O and native code that release the GIL, so building
+        # them in parallel costs about as long as the slowest one. At most one filter
+        # per chain touches the GPU, so CUDA initialization never races.
+        with ThreadPoolExecutor(max_workers=len(correction_filters)) as executor:
+            futures = [
+                (executor.submit(constructor), returns_stats)
+                for constructor, returns_stats in correction_filters
+            ]
+            filters = [(parser_filter, False)]
+            filters.extend((future.result(), returns_stats) for future, returns_stats in futures)
+
         # TTS normalization and output generation always at the end
         filters.extend([(TTSNormalizer(), False), (output_generator, False)])
 
@@ -0,0 +1,52 @@
+"""Content-addressed LRU cache for per-block correction results."""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any
+
+
+class ContentCache:
+    """
+    Least-recently-used cache keyed by a hash of the text.
+
+    Documents repeat boilerplate (headers, scene breaks, name lists), and a
+    repeated block gets the same correction, so it can skip the model or
+    LanguageTool entirely. Keys are 16-byte BLAKE2b digests, so long blocks
+    are not kept alive as keys.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        """
+        Args:
+            maxsize: Maximum number of entries before the oldest is evicted
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, Any] = OrderedDict()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        """Hash ``text`` to a cache key."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, text: str, default: Any = None) -> Any:
+        """Return the value cached for ``text``, marking it recently used."""
+        key = self.key(text)
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, text: str, value: Any) -> None:
+        """Cache ``value`` for ``text``, evicting the least recently used entry if full."""
+        key = self.key(text)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -8,6 +8,10 @@ _logger = logging.getLogger(__name__)
 _cache_lock = threading.Lock()
 _cached_tool: tuple[object, str] | None = None
 
+# Matched by name: language_tool_python moved its exception classes from
+# ``utils`` to ``exceptions`` between major versions
+_TRANSIENT_ERROR_NAMES = frozenset({"RateLimitError", "ServerError"})
+
 
 def is_java_available() -> bool:
     """Return True when a `java` executable is present on the PATH."""
@@ -15,6 +19,20 @@ def is_java_available() -> bool:
     return which("java") is not None
 
 
+def is_transient_error(exc: BaseException) -> bool:
+    """Return True when a failed LanguageTool check may succeed if retried.
+
+    Connection failures and timeouts (raised directly, or wrapped in a
+    LanguageToolError by language_tool_python), rate limiting and a local
+    server that is restarting are transient. Anything else, such as an invalid
+    response, fails the same way again.
+    """
+
+    if isinstance(exc, OSError) or isinstance(exc.__cause__, OSError):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
 def _build_language_tool(logger: logging.Logger | None = None):
     """Instantiate the best available LanguageTool backend."""
 
@@ -55,9 +73,17 @@ def _build_language_tool(logger: logging.Logger | None = None):
 
 
 def get_language_tool(logger: logging.Logger | None = None, force_refresh: bool = False):
-    """Return a cached LanguageTool client and its backend identifier."""
+    """Return a cached LanguageTool client and its backend identifier.
+
+    The client is built once per process and shared by every filter instance,
+    so only the first caller pays for the JVM start-up. Later calls return it
+    without taking the lock.
+    """
 
     global _cached_tool
+    cached = _cached_tool
+    if cached is not None and not force_refresh:
+        return cached
     with _cache_lock:
         if force_refresh or _cached_tool is None:
             _cached_tool = _build_language_tool(logger)
@@ -0,0 +1,448 @@
+"""Helpers for constructing and driving llama-cpp-python models."""
+
+import os
+import re
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+
+def physical_cores() -> int:
+    """
+    Count the physical CPU cores, not counting SMT siblings.
+
+    Uses psutil when it is installed; otherwise assumes two hardware threads
+    per core. The result never exceeds the CPUs this process may run on.
+
+    Returns:
+        Number of physical cores, at least 1
+    """
+    if hasattr(os, "sched_getaffinity"):
+        logical = len(os.sched_getaffinity(0))
+    else:
+        logical = os.cpu_count() or 2
+
+    try:
+        import psutil
+
+        cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        cores = None
+
+    return max(1, min(cores or logical // 2, logical))
+
+
+def llama_params(gpu: bool) -> dict[str, Any]:
+    """
+    Return tuned ``Llama`` constructor arguments for a CPU or GPU run.
+
+    - ``n_batch`` above the 512 default keeps prompt prefill from starving
+      the GPU (or CPU SIMD units) on short grammar prompts.
+    - ``logits_all=False`` materializes logits for the last token only.
+    - The model is memory-mapped but not mlocked: hot pages stay resident on
+      their own, while pinning the whole file slows loading and can exhaust
+      RAM when the file is larger than what is free.
+    - On GPU, ``offload_kqv`` keeps the KV cache on device and ``flash_attn``
+      fuses attention into one kernel that never materializes the full score
+      matrix, which speeds up prefill and shrinks the compute buffer. It stays
+      off on CPU, where llama.cpp's flash attention path is not faster.
+    - On CPU, ``n_threads`` and ``n_threads_batch`` (prefill) are the physical
+      core count: the SIMD matmul kernels saturate each core, so SMT siblings
+      only add contention.
+
+    Args:
+        gpu: Whether the model will be offloaded to a GPU
+
+    Returns:
+        Keyword arguments for ``llama_cpp.Llama``
+    """
+    params: dict[str, Any] = {
+        "n_batch": 2048 if gpu else 1024,
+        "logits_all": False,
+        "use_mlock": False,
+        "use_mmap": True,
+    }
+
+    if gpu:
+        params.update(main_gpu=0, tensor_split=None, offload_kqv=True, flash_attn=True)
+    else:
+        params["n_threads"] = params["n_threads_batch"] = physical_cores()
+
+    return params
+
+
+_QUANT_SUFFIX_RE = re.compile(r"(?<=[.-])Q\d\w*(?=\.gguf$)", re.IGNORECASE)
+
+
+def pick_quant(model_path: str | Path, n_gpu_layers: int) -> Path:
+    """
+    Prefer a sibling Q8_0 GGUF when the model will run entirely on CPU.
+
+    CPU matmul kernels without native 4-bit support dequantize Q4 weights to
+    int8 before every matmul, so Q8_0 is usually faster there despite the
+    larger file. On GPU the Q4 file is kept: its dequant cost is amortized
+    by batching and it saves VRAM.
+
+    Args:
+        model_path: Path to the preferred (typically Q4_K_M) model file
+        n_gpu_layers: Layers that will be offloaded (0 = CPU only)
+
+    Returns:
+        The Q8_0 sibling if running on CPU and it exists, else ``model_path``
+    """
+    model_path = Path(model_path)
+    if n_gpu_layers != 0:
+        return model_path
+
+    q8_path = model_path.with_name(_QUANT_SUFFIX_RE.sub("Q8_0", model_path.name))
+    if q8_path != model_path and q8_path.is_file():
+        return q8_path
+    return model_path
+
+
+def auto_gpu_layers(model_path: str | Path, n_layers: int, headroom: float = 1.2) -> int:
+    """
+    Choose ``n_gpu_layers`` from the VRAM currently free on GPU 0.
+
+    Returns -1 (offload every layer) when the model file plus ``headroom`` fits,
+    otherwise the number of layers that fit assuming equally sized layers.
+
+    Args:
+        model_path: Path to the GGUF model file
+        n_layers: Transformer layer count of the model, used for partial offload
+        headroom: Multiplier on the file size covering KV cache and scratch buffers
+
+    Returns:
+        Layer count for ``n_gpu_layers`` (-1 if pynvml is unavailable)
+    """
+    try:
+        import pynvml
+    except ImportError:
+        return -1
+
+    try:
+        pynvml.nvmlInit()
+        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+        free = pynvml.nvmlDeviceGetMemoryInfo(handle).free
+    except pynvml.NVMLError:
+        return -1
+    finally:
+        try:
+            pynvml.nvmlShutdown()
+        except pynvml.NVMLError:
+            pass
+
+    model_bytes = Path(model_path).stat().st_size * headroom
+    if free >= model_bytes:
+        return -1
+    return max(0, int(free / (model_bytes / n_layers)))
+
+
+def build_llama(model_path: str | Path, gpu: bool, n_gpu_layers: int = -1, **overrides: Any):
+    """
+    Construct a ``llama_cpp.Llama`` with the tuned defaults from llama_params().
+
+    Args:
+        model_path: Path to the GGUF model file
+        gpu: Whether to offload layers to the GPU
+        n_gpu_layers: Layers to offload when ``gpu`` is True (-1 = all)
+        **overrides: Extra or overriding ``Llama`` keyword arguments
+
+    Returns:
+        Loaded ``llama_cpp.Llama`` instance
+    """
+    from llama_cpp import Llama
+
+    params = llama_params(gpu)
+    params["n_gpu_layers"] = n_gpu_layers if gpu else 0
+    params.update(overrides)
+
+    return Llama(model_path=str(model_path), **params)
+
+
+def length_bins(lengths: Sequence[int], n_bins: int = 4) -> list[list[int]]:
+    """
+    Group item indices into bins of similar length, shortest bin first.
+
+    Batching items of similar length keeps a batch from waiting on one much
+    longer generation while the rest of its sequences sit finished.
+
+    Args:
+        lengths: Length (e.g. token count) of each item
+        n_bins: Number of quantile bins to split into
+
+    Returns:
+        Lists of indices into ``lengths``; empty bins are omitted
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    size, extra = divmod(len(order), n_bins)
+    bins, start = [], 0
+    for b in range(n_bins):
+        end = start + size + (b < extra)
+        if end > start:
+            bins.append(order[start:end])
+        start = end
+    return bins
+
+
+class BatchContext:
+    """
+    A llama.cpp context and batch for generate_batch, kept across calls.
+
+    Creating a context allocates its KV cache and compute buffers, which costs
+    more than decoding a few short paragraphs. Passing one BatchContext to a
+    series of generate_batch calls allocates once and only clears the KV cache
+    between calls. When a call needs more room the context is recreated,
+    doubling its size so a run of growing batches reallocates only a few times.
+
+    Use it as a context manager, or call close(), to free the context.
+    """
+
+    def __init__(self, llm: Any):
+        """
+        Args:
+            llm: The loaded ``llama_cpp.Llama`` whose weights the context uses
+        """
+        self.llm = llm
+        self.ctx = None
+        self.batch = None
+        self.n_ctx = self.n_batch = self.n_seq_max = 0
+
+    def prepare(self, n_ctx: int, n_batch: int, n_seqs: int) -> None:
+        """
+        Make the context at least this large, with an empty KV cache.
+
+        Args:
+            n_ctx: KV cells needed (prompt tokens plus generated tokens)
+            n_batch: Tokens decoded in the largest single llama_decode call
+            n_seqs: Sequences decoded together
+        """
+        import llama_cpp
+
+        if (
+            self.ctx is not None
+            and n_ctx <= self.n_ctx
+            and n_batch <= self.n_batch
+            and n_seqs <= self.n_seq_max
+        ):
+            if hasattr(llama_cpp, "llama_memory_clear"):
+                llama_cpp.llama_memory_clear(llama_cpp.llama_get_memory(self.ctx), True)
+            else:
+                llama_cpp.llama_kv_cache_clear(self.ctx)  # Older bindings
+            return
+
+        if self.ctx is not None:
+            n_ctx = max(n_ctx, 2 * self.n_ctx)
+            n_batch = max(n_batch, 2 * self.n_batch)
+            n_seqs = max(n_seqs, self.n_seq_max)
+        self.close()
+
+        ctx_params = llama_cpp.llama_context_default_params()
+        ctx_params.n_ctx = n_ctx
+        ctx_params.n_batch = n_batch
+        ctx_params.n_seq_max = n_seqs
+        # Newer llama.cpp splits the KV cache per sequence unless it is unified, and
+        # prefix cells tagged with every sequence ID need the single shared cache
+        if hasattr(ctx_params, "kv_unified"):
+            ctx_params.kv_unified = True
+        # Inherit the model's attention/KV-cache settings (flash attention, quantized KV)
+        for field in (
+            "n_threads",
+            "n_threads_batch",
+            "offload_kqv",
+            "flash_attn",
+            "flash_attn_type",
+            "type_k",
+            "type_v",
+        ):
+            if hasattr(ctx_params, field):
+                setattr(ctx_params, field, getattr(self.llm.context_params, field))
+
+        ctx = llama_cpp.llama_new_context_with_model(self.llm.model, ctx_params)
+        if ctx is None:
+            raise RuntimeError("Failed to create llama.cpp context for batched generation")
+        self.ctx = ctx
+        self.batch = llama_cpp.llama_batch_init(n_batch, 0, n_seqs)
+        self.n_ctx, self.n_batch, self.n_seq_max = n_ctx, n_batch, n_seqs
+
+    def close(self) -> None:
+        """Free the context and batch; the next prepare() creates new ones."""
+        import llama_cpp
+
+        if self.batch is not None:
+            llama_cpp.llama_batch_free(self.batch)
+            self.batch = None
+        if self.ctx is not None:
+            llama_cpp.llama_free(self.ctx)
+            self.ctx = None
+        self.n_ctx = self.n_batch = self.n_seq_max = 0
+
+    def __enter__(self) -> "BatchContext":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def generate_batch(
+    llm: Any,
+    prompts: Sequence[str | Sequence[int]],
+    max_tokens: int | Sequence[int] = 256,
+    stop: Sequence[str] = (),
+    prefix: str = "",
+    context: BatchContext | None = None,
+) -> list[str]:
+    """
+    Generate completions for several prompts in one batched decode.
+
+    Every prompt is assigned its own sequence ID so all prompts are prefilled
+    by a single ``llama_decode`` call, and each decode step afterwards advances
+    every unfinished sequence at once. The decode runs in a dedicated context
+    built from the already-loaded model weights: ``context`` when given, so
+    repeated calls share one allocation, otherwise one sized for this batch
+    and freed afterwards.
+
+    When ``prefix`` is given, its tokens are decoded once and tagged with
+    every sequence ID, so the shared instruction occupies one set of KV cells
+    and only the per-prompt remainder is prefilled separately.
+
+    Decoding is greedy, which matches the near-deterministic sampling settings
+    (temperature 0.1, top_p 0.15) used for grammar correction.
+
+    Args:
+        llm: A loaded ``llama_cpp.Llama`` instance
+        prompts: Prompts to complete (text following ``prefix``), each either a
+            string or already-tokenized IDs, which are used as-is
+        max_tokens: Maximum tokens to generate, either one limit for all prompts
+            or one per prompt
+        stop: Stop strings; a sequence stops as soon as its output contains one
+        prefix: Text shared by every prompt, placed before each of them
+        context: A BatchContext to decode in, kept open by the caller
+
+    Returns:
+        Completion text for each prompt, in input order
+
+    Raises:
+        ValueError: If a prompt tokenizes to no tokens (e.g. an empty string
+            after a prefix, which gets no BOS)
+    """
+    import llama_cpp
+    import numpy as np
+
+    if not prompts:
+        return []
+
+    prefix_ids = llm.tokenize(prefix.encode("utf-8"), add_bos=True, special=True) if prefix else []
+    prompt_ids = [
+        (
+            llm.tokenize(p.encode("utf-8"), add_bos=not prefix_ids, special=True)
+            if isinstance(p, str)
+            else list(p)
+        )
+        for p in prompts
+    ]
+    # Each sequence takes its first logits from its own last prompt token
+    empty = [i for i, ids in enumerate(prompt_ids) if not ids]
+    if empty:
+        raise ValueError(f"Prompts at positions {empty} tokenize to no tokens")
+    n_seqs = len(prompt_ids)
+    n_prompt_tokens = len(prefix_ids) + sum(len(ids) for ids in prompt_ids)
+    if isinstance(max_tokens, int):
+        max_tokens = [max_tokens] * n_seqs
+    n_vocab = llm.n_vocab()
+    # Stop on any end-of-generation token (EOS, EOT, ...), not just EOS
+    if hasattr(llama_cpp, "llama_model_get_vocab"):
+        vocab = llama_cpp.llama_model_get_vocab(llm.model)
+    else:
+        vocab = llm.model  # Older bindings take the model itself
+    if hasattr(llama_cpp, "llama_token_is_eog"):
+
+        def is_eog(token: int) -> bool:
+            return bool(llama_cpp.llama_token_is_eog(vocab, token))
+
+    else:
+        eos = llm.token_eos()
+
+        def is_eog(token: int) -> bool:
+            return token == eos
+
+    owned = context is None
+    if owned:
+        context = BatchContext(llm)
+    context.prepare(
+        n_ctx=n_prompt_tokens + sum(max_tokens),
+        n_batch=max(n_prompt_tokens, n_seqs),
+        n_seqs=n_seqs,
+    )
+    ctx, batch = context.ctx, context.batch
+
+    def add_token(token: int, pos: int, seq_ids: Sequence[int], logits: bool) -> int:
+        i = batch.n_tokens
+        batch.token[i] = token
+        batch.pos[i] = pos
+        batch.n_seq_id[i] = len(seq_ids)
+        for k, seq_id in enumerate(seq_ids):
+            batch.seq_id[i][k] = seq_id
+        batch.logits[i] = logits
+        batch.n_tokens += 1
+        return i
+
+    def decode():
+        if llama_cpp.llama_decode(ctx, batch) != 0:
+            raise RuntimeError("llama_decode failed during batched generation")
+
+    try:
+        # Prefill all prompts together, requesting logits only for each last token.
+        # Shared prefix tokens belong to every sequence and are decoded once.
+        logits_index = {}
+        batch.n_tokens = 0
+        all_seqs = range(n_seqs)
+        for pos, token in enumerate(prefix_ids):
+            add_token(token, pos, all_seqs, False)
+        n_prefix = len(prefix_ids)
+        for seq_id, ids in enumerate(prompt_ids):
+            for pos, token in enumerate(ids):
+                index = add_token(token, n_prefix + pos, (seq_id,), pos == len(ids) - 1)
+            logits_index[seq_id] = index
+        decode()
+
+        n_past = [n_prefix + len(ids) for ids in prompt_ids]
+        outputs = [b"" for _ in prompt_ids]
+        n_generated = [0] * n_seqs
+        active = set(range(n_seqs))
+
+        while active:
+            batch.n_tokens = 0
+            for seq_id in sorted(active):
+                logits = np.ctypeslib.as_array(
+                    llama_cpp.llama_get_logits_ith(ctx, logits_index[seq_id]), shape=(n_vocab,)
+                )
+                token = int(logits.argmax())
+
+                if is_eog(token):
+                    active.discard(seq_id)
+                    continue
+
+                outputs[seq_id] += llm.detokenize([token])
+                n_generated[seq_id] += 1
+                text = outputs[seq_id].decode("utf-8", errors="ignore")
+                if any(s in text for s in stop) or n_generated[seq_id] >= max_tokens[seq_id]:
+                    active.discard(seq_id)
+                    continue
+
+                logits_index[seq_id] = add_token(token, n_past[seq_id], (seq_id,), True)
+                n_past[seq_id] += 1
+
+            if batch.n_tokens:
+                decode()
+    finally:
+        if owned:
+            context.close()
+
+    results = []
+    for output in outputs:
+        text = output.decode("utf-8", errors="ignore")
+        for s in stop:
+            text = text.split(s, 1)[0]
+        results.append(text)
+    return results
@@ -0,0 +1,145 @@
+"""Cheap checks for text that does not need a model-based correction pass."""
+
+import re
+from functools import lru_cache
+
+from spellchecker import SpellChecker
+
+_WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s[,.;:!?]")
+_MISSING_CAPITAL_RE = re.compile(r"(?:^|[.!?]\s+)[a-z]")
+# Anything one of LanguageTool's safe rules could match: repeated words; brackets,
+# double quotes and curly single quotes; straight single quotes not inside a word;
+# punctuation not followed by a space; runs of spaces or tabs; and personal
+# pronouns, which PERSPECTIVE_AGREEMENT checks against the verbs around them
+_RULE_TRIGGER_RE = re.compile(
+    r"\b(\w+)\s+\1\b"
+    r"|[\[\](){}`\"“”‘’]"
+    r"|(?<![A-Za-z])'|'(?![A-Za-z])"
+    r"|[.!?,;:][A-Za-z]"
+    r"|[^\S\n]{2,}"
+    r"|\b(?:i|me|my|mine|myself|you|your|yours|yourself|yourselves|he|him|his|himself"
+    r"|she|her|hers|herself|it|its|itself|we|us|our|ours|ourselves|they|them|their"
+    r"|theirs|themselves)\b",
+    re.IGNORECASE,
+)
+# A lowercase letter opening the text or a sentence, behind any quotes or brackets
+_LOWERCASE_START_RE = re.compile(r"(?:^|[.!?])[^A-Za-z0-9]*[a-z]")
+
+
+@lru_cache(maxsize=1)
+def _spell_checker() -> SpellChecker:
+    """Load the English word list once per process."""
+    return SpellChecker()
+
+
+def _is_sentence_start(text: str, index: int) -> bool:
+    """Whether the word at ``index`` opens a sentence (ignoring opening quotes)."""
+    before = text[:index].rstrip(" \t\n\"'“‘(")
+    return not before or before[-1] in ".!?"
+
+
+def count_misspellings(text: str) -> int:
+    """
+    Count words missing from the English dictionary.
+
+    Capitalized words are likely proper nouns (character names, places): they
+    are skipped in mid-sentence, and at the start of a sentence only count when
+    a dictionary word is one edit away (e.g. "Teh" but not "Seraphim").
+
+    Args:
+        text: Text to check
+
+    Returns:
+        Number of misspelled words
+    """
+    spell = _spell_checker()
+    count = 0
+    for m in _WORD_RE.finditer(text):
+        word = m.group()
+        if not word[0].isupper():
+            count += bool(spell.unknown([word]))
+        elif _is_sentence_start(text, m.start()) and spell.unknown([word]):
+            count += bool(spell.known(spell.edit_distance_1(word.lower())))
+    return count
+
+
+def count_punctuation_anomalies(text: str) -> int:
+    """
+    Count trivial punctuation and spacing problems.
+
+    Covers whitespace before punctuation, doubled spaces, and a lowercase
+    letter opening the text or following a sentence end.
+
+    Args:
+        text: Text to check
+
+    Returns:
+        Number of anomalies found
+    """
+    return (
+        len(_SPACE_BEFORE_PUNCT_RE.findall(text))
+        + text.count("  ")
+        + len(_MISSING_CAPITAL_RE.findall(text))
+    )
+
+
+def looks_clean(text: str, max_words: int = 40) -> bool:
+    """
+    Whether a text is short and free of obvious errors, so a model call can be skipped.
+
+    This only catches surface problems (spelling, punctuation, capitalization);
+    grammar errors in clean-looking text go unnoticed, which is why only short
+    texts qualify.
+
+    Args:
+        text: Text to check
+        max_words: Texts with this many words or more always need correction
+
+    Returns:
+        True if the text can be kept unchanged without calling the model
+    """
+    if len(text.split()) >= max_words:
+        return False
+    return count_punctuation_anomalies(text) == 0 and count_misspellings(text) == 0
+
+
+def has_unknown_word(text: str) -> bool:
+    """
+    Whether any word, capitalized or not, is missing from the English dictionary.
+
+    Unlike count_misspellings, names get no benefit of the doubt: LanguageTool's
+    spelling rule checks them too, so an unknown capitalized word may be a typo
+    it would fix.
+
+    Args:
+        text: Text to check
+
+    Returns:
+        True if at least one word is not in the dictionary
+    """
+    return bool(_spell_checker().unknown(m.group() for m in _WORD_RE.finditer(text)))
+
+
+def needs_rule_check(text: str) -> bool:
+    """
+    Whether LanguageTool's safe rules could find anything to fix in a text.
+
+    Those rules fix misspellings, repeated words, brackets and quotes, spacing
+    around punctuation, sentence-start casing and pronoun-verb agreement. Only a
+    text that provably shows none of these patterns skips the LanguageTool round
+    trip; anything doubtful is sent. The regex checks run first, so the
+    dictionary lookup only happens for otherwise clean text.
+
+    Args:
+        text: Text to check
+
+    Returns:
+        True if the text should be sent to LanguageTool
+    """
+    return bool(
+        _RULE_TRIGGER_RE.search(text)
+        or _LOWERCASE_START_RE.search(text)
+        or count_punctuation_anomalies(text)
+        or has_unknown_word(text)
+    )
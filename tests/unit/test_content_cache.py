@@ -0,0 +1,39 @@
+"""
+Unit tests for the content-addressed LRU cache used by the correction filters.
+"""
+
+from satcn.core.utils.content_cache import ContentCache
+
+
+class TestContentCache:
+    """Test suite for ContentCache."""
+
+    def test_get_returns_cached_value(self):
+        """Values are found again by their text."""
+        cache = ContentCache()
+        cache.put("Chapter One", "Chapter One.")
+
+        assert cache.get("Chapter One") == "Chapter One."
+        assert cache.get("Chapter Two") is None
+        assert cache.get("Chapter Two", "missing") == "missing"
+
+    def test_evicts_least_recently_used(self):
+        """The entry used longest ago is dropped once the cache is full."""
+        cache = ContentCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_zero_size_disables_caching(self):
+        """A cache with maxsize 0 keeps nothing."""
+        cache = ContentCache(maxsize=0)
+        cache.put("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
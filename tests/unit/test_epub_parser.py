@@ -0,0 +1,128 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from ebooklib import epub
+
+from satcn.core.filters.epub_parser import EpubOutputGenerator, EpubParserFilter
+
+SAMPLE_EPUB = Path(__file__).parent.parent / "samples" / "sample_epub_basic.epub"
+
+
+@pytest.fixture
+def epub_file(tmp_path):
+    """Copy the sample EPUB so generated output stays in a temp directory."""
+    file_path = tmp_path / "test.epub"
+    shutil.copy(SAMPLE_EPUB, file_path)
+    return str(file_path)
+
+
+def test_shared_parse_is_reused(epub_file):
+    """
+    Tests that shared parsers return the cached book for an unmodified file.
+    """
+    first = EpubParserFilter(shared=True).process(epub_file)
+    second = EpubParserFilter(shared=True).process(epub_file)
+
+    assert second["book"] is first["book"]
+    assert [b["content"] for b in second["text_blocks"]] == [
+        b["content"] for b in first["text_blocks"]
+    ]
+
+
+def test_shared_output_leaves_cache_untouched(epub_file):
+    """
+    Tests that writing corrections from a shared parse edits a copy, not the cache.
+    """
+    data = EpubParserFilter(shared=True).process(epub_file)
+    original = [b["content"] for b in data["text_blocks"]]
+    assert original
+
+    for block in data["text_blocks"]:
+        block["content"] = "CORRECTED"
+    result = EpubOutputGenerator().process(data)
+
+    corrected = EpubParserFilter().process(result["output_filepath"])
+    assert all(b["content"] == "CORRECTED" for b in corrected["text_blocks"])
+
+    again = EpubParserFilter(shared=True).process(epub_file)
+    assert [b["content"] for b in again["text_blocks"]] == original
+    assert again["book"] is data["book"]
+    assert result["book"] is not data["book"]
+
+
+def test_inline_markup_paragraphs(tmp_path):
+    """
+    Tests that paragraphs with inline tags are extracted and that unchanged
+    paragraphs keep their markup on output.
+    """
+    book = epub.EpubBook()
+    book.set_identifier("inline-test")
+    book.set_title("Inline")
+    book.set_language("en")
+    chapter = epub.EpubHtml(title="One", file_name="one.xhtml", lang="en")
+    chapter.content = "<html><body><p>She said <i>hello</i>!</p><p>Teh end.</p></body></html>"
+    book.add_item(chapter)
+    book.toc = [epub.Link("one.xhtml", "One", "one")]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = [chapter]
+    file_path = str(tmp_path / "inline.epub")
+    epub.write_epub(file_path, book, {})
+
+    data = EpubParserFilter().process(file_path)
+    assert [b["content"] for b in data["text_blocks"]] == ["She said hello!", "Teh end."]
+
+    data["text_blocks"][1]["content"] = "The end."
+    result = EpubOutputGenerator().process(data)
+
+    html = str(result["html_docs"]["one.xhtml"])
+    assert "<i>hello</i>" in html
+    assert "The end." in html
+
+
+def test_inline_markup_corrections_keep_tags(tmp_path):
+    """
+    Tests that corrections to paragraphs with inline tags keep the tags, and that
+    a correction straddling two text nodes leaves the paragraph unchanged.
+    """
+    book = epub.EpubBook()
+    book.set_identifier("inline-fix-test")
+    book.set_title("Inline")
+    book.set_language("en")
+    chapter = epub.EpubHtml(title="One", file_name="one.xhtml", lang="en")
+    chapter.content = (
+        "<html><body>"
+        '<p>Teh <i>quik</i> fox saw <a href="#x">teh</a> <b>dog</b> .</p>'
+        "<p>W<b>orl</b> peace.</p>"
+        "</body></html>"
+    )
+    book.add_item(chapter)
+    book.toc = [epub.Link("one.xhtml", "One", "one")]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = [chapter]
+    file_path = str(tmp_path / "inline.epub")
+    epub.write_epub(file_path, book, {})
+
+    data = EpubParserFilter().process(file_path)
+    data["text_blocks"][0]["content"] = "The quick fox saw the dog."
+    data["text_blocks"][1]["content"] = "Word peace."
+    result = EpubOutputGenerator().process(data)
+
+    html = str(result["html_docs"]["one.xhtml"])
+    assert '<p>The <i>quick</i> fox saw <a href="#x">the</a> <b>dog</b>.</p>' in html
+    assert "<p>W<b>orl</b> peace.</p>" in html
+
+
+def test_buffer_input(epub_file):
+    """
+    Tests that an already-read buffer parses the same as the file path.
+    """
+    from_path = EpubParserFilter().process(epub_file)
+    from_buffer = EpubParserFilter(buffer=Path(epub_file).read_bytes()).process(epub_file)
+
+    assert [b["content"] for b in from_buffer["text_blocks"]] == [
+        b["content"] for b in from_path["text_blocks"]
+    ]
+    assert from_buffer["filepath"] == epub_file
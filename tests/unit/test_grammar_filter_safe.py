@@ -1,4 +1,5 @@
 import logging
+from types import SimpleNamespace
 
 import language_tool_python
 import pytest
@@ -57,6 +58,25 @@ def test_malformed_markdown_reverts(grammar_filter):
     assert sum(stats.values()) == 0
 
 
+def test_language_tool_shared_between_filters(monkeypatch):
+    builds = []
+
+    def _build(logger=None):
+        builds.append(logger)
+        return SimpleNamespace(), "fake"
+
+    lt_utils.reset_language_tool_cache()
+    monkeypatch.setattr(lt_utils, "_build_language_tool", _build)
+    try:
+        first = GrammarCorrectionFilterSafe()
+        second = GrammarCorrectionFilterSafe()
+
+        assert first.tool is second.tool
+        assert len(builds) == 1
+    finally:
+        lt_utils.reset_language_tool_cache()
+
+
 def test_language_tool_initialization_failure_graceful(monkeypatch, caplog):
     caplog.set_level(logging.WARNING)
     lt_utils.reset_language_tool_cache()
@@ -81,3 +101,152 @@ def test_language_tool_initialization_failure_graceful(monkeypatch, caplog):
         ) or any("disabled" in record.message for record in caplog.records)
     finally:
         lt_utils.reset_language_tool_cache()
+
+
+def test_process_checks_blocks_in_one_request(grammar_filter):
+    checked = []
+
+    class FakeTool:
+        def check(self, text):
+            checked.append(text)
+            offset = text.index("second")
+            return [
+                SimpleNamespace(
+                    ruleId="UPPERCASE_SENTENCE_START",
+                    offset=offset,
+                    errorLength=1,
+                    replacements=["S"],
+                )
+            ]
+
+    grammar_filter.tool = FakeTool()
+    data = {"text_blocks": [{"content": "First."}, {"content": ""}, {"content": "second."}]}
+    corrected_data, stats = grammar_filter.process(data)
+
+    assert len(checked) == 1
+    assert [block["content"] for block in corrected_data["text_blocks"]] == [
+        "First.",
+        "",
+        "Second.",
+    ]
+    assert stats["casing_fixed"] == 1
+
+
+def test_overlapping_matches_apply_first_only(grammar_filter):
+    def typo(errorLength, replacement):
+        return SimpleNamespace(
+            ruleId="MORFOLOGIK_RULE_EN_US", errorLength=errorLength, replacements=[replacement]
+        )
+
+    matches = [(6, typo(5, "world")), (0, typo(4, "Hello")), (2, typo(4, "xx"))]
+    corrected, stats = grammar_filter._apply_matches("Helo, wrold.", matches)
+
+    assert corrected == "Hello, world."
+    assert stats["typos_fixed"] == 2
+
+
+def test_replacement_breaking_markdown_reverts(grammar_filter):
+    bracket = SimpleNamespace(ruleId="UNPAIRED_BRACKETS", errorLength=1, replacements=[""])
+    corrected, stats = grammar_filter._apply_matches("See [the docs](url).", [(4, bracket)])
+
+    assert corrected == "See [the docs](url)."
+    assert sum(stats.values()) == 0
+
+
+def test_check_retries_only_transient_errors(grammar_filter, monkeypatch):
+    calls = []
+
+    class FlakyTool:
+        def __init__(self, errors):
+            self.errors = list(errors)
+
+        def check(self, text):
+            calls.append(text)
+            if self.errors:
+                raise self.errors.pop(0)
+            return []
+
+    monkeypatch.setattr("satcn.core.filters.grammar_filter_safe.time.sleep", lambda delay: None)
+
+    wrapped = language_tool_python.exceptions.LanguageToolError("http://localhost: refused")
+    wrapped.__cause__ = ConnectionError("refused")
+    grammar_filter.tool = FlakyTool([TimeoutError("slow"), wrapped])
+    assert grammar_filter._check_with_retry("Text.") == []
+    assert len(calls) == 3
+
+    calls.clear()
+    grammar_filter.tool = FlakyTool([language_tool_python.exceptions.LanguageToolError("bad")])
+    with pytest.raises(language_tool_python.exceptions.LanguageToolError):
+        grammar_filter._check_with_retry("Text.")
+    assert len(calls) == 1
+
+
+def test_unsafe_matches_skip_validation(grammar_filter, monkeypatch):
+    def _fail(*args):
+        raise AssertionError("validation should be skipped")
+
+    monkeypatch.setattr(grammar_filter, "_validate_markdown_structure", _fail)
+    style = SimpleNamespace(ruleId="PASSIVE_VOICE", errorLength=3, replacements=["was"])
+    corrected, stats = grammar_filter._apply_matches("It is done.", [(3, style)])
+
+    assert corrected == "It is done."
+    assert sum(stats.values()) == 0
+
+
+def test_repeated_blocks_are_checked_once(grammar_filter):
+    checked = []
+
+    class FakeTool:
+        def check(self, text):
+            checked.append(text)
+            return []
+
+    grammar_filter.tool = FakeTool()
+    grammar_filter.process({"text_blocks": [{"content": "the end."}, {"content": "the end."}]})
+    grammar_filter.process({"text_blocks": [{"content": "the end."}, {"content": "new text."}]})
+
+    assert checked == ["the end.", "new text."]
+
+
+def test_clean_blocks_skip_language_tool(grammar_filter):
+    checked = []
+
+    class FakeTool:
+        def check(self, text):
+            checked.append(text)
+            return []
+
+    grammar_filter.tool = FakeTool()
+    data = {"text_blocks": [{"content": "The cat sat on the mat."}, {"content": "the end."}]}
+    corrected_data, stats = grammar_filter.process(data)
+
+    assert checked == ["the end."]
+    assert corrected_data["text_blocks"][0]["content"] == "The cat sat on the mat."
+    assert sum(stats.values()) == 0
+
+
+def test_prefilter_does_not_change_output(grammar_filter_ready, monkeypatch):
+    # Blocks the prefilter skips must be ones LanguageTool would leave unchanged
+    corpus = [
+        "The cat sat on the mat.",
+        "I is going home.",
+        "The letter came on Wensday.",
+        "It was the the end.",
+        "this starts lowercase.",
+        "Two  spaces here.",
+        "The end.Next chapter.",
+        "Don't wake the cat's owner.",
+        "She said hello , then left.",
+    ]
+
+    def run():
+        data = {"text_blocks": [{"content": text} for text in corpus]}
+        grammar_filter_ready._cache.clear()
+        corrected_data, stats = grammar_filter_ready.process(data)
+        return [block["content"] for block in corrected_data["text_blocks"]], stats
+
+    with_prefilter = run()
+    monkeypatch.setattr(
+        "satcn.core.filters.grammar_filter_safe.needs_rule_check", lambda text: True
+    )
+    assert run() == with_prefilter
@@ -19,7 +19,13 @@ import pytest
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from satcn.core.filters.grmr_v3_filter import LLAMA_CPP_AVAILABLE, GRMRV3GrammarFilter
+from satcn.core.filters.grmr_v3_filter import (
+    LLAMA_CPP_AVAILABLE,
+    GRMRV3GrammarFilter,
+    _cuda_available,
+    clear_model_cache,
+    find_model_path,
+)
 
 # Fixtures
 
@@ -30,6 +36,8 @@ def mock_llama():
     with patch("satcn.core.filters.grmr_v3_filter.Llama") as mock:
         # Mock the model instance
         mock_instance = MagicMock()
+        mock_instance.input_ids = []
+        mock_instance.n_tokens = 0
         mock_instance.return_value = {
             "choices": [{"text": "Corrected text."}],
             "usage": {"completion_tokens": 5},
@@ -42,7 +50,7 @@ def mock_llama():
 def mock_model_file(tmp_path):
     """Create a temporary mock model file."""
     model_file = tmp_path / "test_model.gguf"
-    model_file.write_bytes(b"fake model data")
+    model_file.write_bytes(b"GGUF fake model data")
     return model_file
 
 
@@ -87,10 +95,22 @@ def test_init_missing_model_file(mock_llama):
     assert "not found" in str(exc_info.value).lower()
 
 
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_init_rejects_non_gguf_file(mock_llama, tmp_path):
+    """Test that a file without the GGUF magic is rejected before loading."""
+    model_file = tmp_path / "truncated.gguf"
+    model_file.write_bytes(b"<html>Not Found</html>")
+
+    with pytest.raises(ValueError, match="not a GGUF model file"):
+        GRMRV3GrammarFilter(model_path=str(model_file))
+
+    assert not mock_llama.called
+
+
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_init_with_custom_params(mock_llama, mock_model_file):
     """Test initialization with custom parameters."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(
             model_path=str(mock_model_file),
             n_ctx=2048,
@@ -112,7 +132,7 @@ def test_init_with_custom_params(mock_llama, mock_model_file):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_init_device_auto_detection(mock_llama, mock_model_file):
     """Test automatic device detection."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         # The actual device detection happens inside the init, using a try/except for torch import
         # We can't easily mock torch since it's imported conditionally
         # Instead, just verify that device is set to a valid value
@@ -124,13 +144,125 @@ def test_init_device_auto_detection(mock_llama, mock_model_file):
         assert filter_obj_cpu.device == "cpu"
 
 
+def test_cuda_available_probes_once():
+    """Test that CUDA detection asks an already imported torch once and caches the answer."""
+    fake_torch = MagicMock()
+    fake_torch.cuda.is_available.return_value = True
+    _cuda_available.cache_clear()
+    try:
+        with patch.dict("sys.modules", {"torch": fake_torch}):
+            assert _cuda_available() is True
+            assert _cuda_available() is True
+        assert fake_torch.cuda.is_available.call_count == 1
+
+        _cuda_available.cache_clear()
+        with (
+            patch.dict("sys.modules", {"torch": None}),
+            patch("ctypes.CDLL", side_effect=OSError("no driver")),
+        ):
+            assert _cuda_available() is False
+    finally:
+        _cuda_available.cache_clear()
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_init_llama_overrides(mock_llama, mock_model_file):
+    """Test that llama_overrides extend and replace the Llama arguments."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        GRMRV3GrammarFilter(
+            model_path=str(mock_model_file),
+            device="cuda",
+            llama_overrides={"n_gpu_layers": 20, "flash_attn": True, "verbose": False},
+        )
+
+        kwargs = mock_llama.call_args.kwargs
+        assert kwargs["n_gpu_layers"] == 20
+        assert kwargs["flash_attn"] is True
+        assert kwargs["verbose"] is False
+        assert kwargs["n_ctx"] == 4096
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_init_runtime_params(mock_llama, mock_model_file):
+    """Test that explicit llama.cpp load settings reach Llama."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        GRMRV3GrammarFilter(model_path=str(mock_model_file), device="cpu")
+        assert mock_llama.call_args.kwargs["use_mlock"] is False
+        assert mock_llama.call_args.kwargs["use_mmap"] is True
+        assert "n_ubatch" not in mock_llama.call_args.kwargs
+
+        GRMRV3GrammarFilter(
+            model_path=str(mock_model_file),
+            device="cpu",
+            n_gpu_layers=4,
+            n_batch=512,
+            n_ubatch=256,
+            flash_attn=True,
+            n_threads=3,
+            use_mlock=True,
+        )
+
+        kwargs = mock_llama.call_args.kwargs
+        assert kwargs["n_gpu_layers"] == 4
+        assert kwargs["n_batch"] == 512
+        assert kwargs["n_ubatch"] == 256
+        assert kwargs["flash_attn"] is True
+        assert kwargs["n_threads"] == 3
+        assert kwargs["n_threads_batch"] == 3
+        assert kwargs["use_mlock"] is True
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_init_reuses_loaded_model(mock_llama, mock_model_file):
+    """Test that identical filters share one Llama instance until the cache is cleared."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        first = GRMRV3GrammarFilter(model_path=str(mock_model_file), device="cpu")
+        second = GRMRV3GrammarFilter(model_path=str(mock_model_file), device="cpu")
+
+        assert second.llm is first.llm
+        assert mock_llama.call_count == 1
+
+        clear_model_cache()
+        GRMRV3GrammarFilter(model_path=str(mock_model_file), device="cpu")
+        assert mock_llama.call_count == 2
+
+
+def test_find_model_path_remembers_hits(mock_model_file, tmp_path):
+    """Test that a found model is re-checked instead of searched for, and misses are retried."""
+    assert find_model_path(mock_model_file) == mock_model_file
+
+    with patch("satcn.core.filters.grmr_v3_filter._search_model_path") as mock_search:
+        assert find_model_path(mock_model_file) == mock_model_file
+        assert not mock_search.called
+
+    later = tmp_path / "later.gguf"
+    assert find_model_path(later) != later
+    later.write_bytes(b"downloaded")
+    assert find_model_path(later) == later
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_init_model_filename(mock_llama, tmp_path):
+    """Test that model_filename selects another quantization in a model directory."""
+    (tmp_path / "GRMR-V3-Q4B.Q4_K_M.gguf").write_bytes(b"GGUF q4")
+    (tmp_path / "GRMR-V3-Q4B.Q8_0.gguf").write_bytes(b"GGUF q8")
+
+    filter_obj = GRMRV3GrammarFilter(
+        model_path=str(tmp_path), model_filename="GRMR-V3-Q4B.Q8_0.gguf"
+    )
+    assert filter_obj.model_path == tmp_path / "GRMR-V3-Q4B.Q8_0.gguf"
+
+    with pytest.raises(FileNotFoundError, match="GRMR-V3-Q4B.Q5_K_M.gguf"):
+        GRMRV3GrammarFilter(model_path=str(tmp_path), model_filename="GRMR-V3-Q4B.Q5_K_M.gguf")
+
+
 # Test: Prompt building
 
 
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_build_prompt(mock_llama, mock_model_file):
     """Test prompt template building."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         test_text = "This is a test sentence."
@@ -142,13 +274,26 @@ def test_build_prompt(mock_llama, mock_model_file):
         assert "copy editor" in prompt.lower()
 
 
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_tokenize_len(mock_llama, mock_model_file):
+    """Test token counting uses the model tokenizer without BOS."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+
+        filter_obj.llm.tokenize.reset_mock()  # Drop the header prefilled while loading
+        filter_obj.llm.tokenize.return_value = [101, 102, 103]
+
+        assert filter_obj.tokenize_len("Three tokens here") == 3
+        filter_obj.llm.tokenize.assert_called_once_with(b"Three tokens here", add_bos=False)
+
+
 # Test: Text correction
 
 
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_correct_text_empty_input(mock_llama, mock_model_file):
     """Test that empty text returns empty string."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         assert filter_obj.correct_text("") == ""
@@ -158,7 +303,7 @@ def test_correct_text_empty_input(mock_llama, mock_model_file):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_correct_text_basic(mock_llama, mock_model_file):
     """Test basic text correction."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         # Mock the model response
@@ -176,7 +321,7 @@ def test_correct_text_basic(mock_llama, mock_model_file):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_correct_text_preserves_on_error(mock_llama, mock_model_file):
     """Test that original text is preserved on error."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         # Mock the model to raise an error
@@ -191,7 +336,7 @@ def test_correct_text_preserves_on_error(mock_llama, mock_model_file):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_correct_text_updates_stats(mock_llama, mock_model_file):
     """Test that correction updates statistics."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         # Mock the model response
@@ -206,13 +351,208 @@ def test_correct_text_updates_stats(mock_llama, mock_model_file):
         assert filter_obj.stats["total_tokens_generated"] > initial_tokens
 
 
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_correct_text_skips_clean_text(mock_llama, mock_model_file):
+    """Test that skip_clean bypasses the model for clean short text."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file), skip_clean=True)
+
+        text = "The cat is sleeping on the couch."
+        result = filter_obj.correct_text(text)
+
+        assert result == text
+        assert not filter_obj.llm.called
+        assert filter_obj.stats["skipped"] == 1
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_correct_text_reuses_prefix_state(mock_llama, mock_model_file):
+    """Test that a shared prompt prefix is prefilled once and restored afterwards."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        llm = mock_llama.return_value
+        llm.tokenize.return_value = [1, 2, 3]
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+
+        # Ignore the instruction header prefilled while loading
+        llm.eval.reset_mock()
+        llm.input_ids = []
+        llm.n_tokens = len(llm.input_ids)
+        llm.return_value = {
+            "choices": [{"text": "Fixed."}],
+            "usage": {"completion_tokens": 2},
+        }
+
+        filter_obj.correct_text("Broke.", prompt_prefix="Chapter 1\n")
+        llm.eval.assert_called_once_with([1, 2, 3])
+        assert llm.call_args.args[0].startswith("Chapter 1\n")
+
+        # Prefix still in the context: nothing to do
+        llm.input_ids = [1, 2, 3, 9]
+        llm.n_tokens = len(llm.input_ids)
+        filter_obj.correct_text("Broke again.", prompt_prefix="Chapter 1\n")
+        assert llm.eval.call_count == 1
+        assert not llm.load_state.called
+
+        # Context replaced by other work: restore the saved state
+        llm.input_ids = [7]
+        llm.n_tokens = len(llm.input_ids)
+        filter_obj.correct_text("Broke once more.", prompt_prefix="Chapter 1\n")
+        assert llm.eval.call_count == 1
+        llm.load_state.assert_called_once_with(llm.save_state.return_value)
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_prefix_state_shared_by_filters_on_one_model(mock_llama, mock_model_file):
+    """Test that filters sharing a model share its saved prefix states."""
+    llm = mock_llama.return_value
+    llm.tokenize.side_effect = lambda text, **kwargs: [len(text)]
+
+    first = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+    llm.input_ids = [len(first._prompt_header)]
+    llm.n_tokens = 1
+
+    # The header is still in the context, so the second filter leaves it there
+    second = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+    assert second.llm is first.llm
+    assert llm.eval.call_count == 1
+    assert not llm.load_state.called
+
+    # The second filter prefills its own prefix, replacing the first's tokens
+    second._prime_prefix("Chapter 2\n")
+    assert llm.eval.call_count == 2
+    llm.input_ids = [len("Chapter 2\n")]
+    llm.n_tokens = 1
+
+    # The first filter notices and restores the header instead of prefilling it
+    first._prime_prefix(first._prompt_header)
+    assert llm.eval.call_count == 2
+    llm.load_state.assert_called_once()
+
+    first.reset_prefix_cache()
+    first._prime_prefix(first._prompt_header)
+    assert llm.eval.call_count == 3
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_correct_text_caches_instruction_prefix(mock_llama, mock_model_file):
+    """Test that the instruction header is prefilled once, at load, for consecutive texts."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        llm = mock_llama.return_value
+        llm.tokenize.return_value = [1, 2, 3]
+        llm.input_ids = [1, 2, 3]
+        llm.n_tokens = len(llm.input_ids)
+        llm.return_value = {
+            "choices": [{"text": "Fixed."}],
+            "usage": {"completion_tokens": 2},
+        }
+
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+        llm.eval.assert_called_once_with([1, 2, 3])
+
+        filter_obj.correct_text("First broke.")
+        filter_obj.correct_text("Second broke.")
+
+        header = GRMRV3GrammarFilter.PROMPT_TEMPLATE.split("{text}")[0]
+        llm.tokenize.assert_called_once_with(header.encode("utf-8"), special=True)
+        llm.eval.assert_called_once_with([1, 2, 3])
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_correct_text_caches_repeated_text(mock_llama, mock_model_file):
+    """Test that a repeated text is served from the cache without calling the model."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+
+        filter_obj.llm.return_value = {
+            "choices": [{"text": "Fixed."}],
+            "usage": {"completion_tokens": 2},
+        }
+
+        assert filter_obj.correct_text("Broke.") == "Fixed."
+        assert filter_obj.correct_text("Broke.") == "Fixed."
+        assert filter_obj.llm.call_count == 1
+        assert filter_obj.stats["cache_hits"] == 1
+
+        with patch("satcn.core.filters.grmr_v3_filter.generate_batch") as mock_generate:
+            assert filter_obj.correct_text_batch(["Broke.", ""]) == ["Fixed.", ""]
+        assert not mock_generate.called
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_correct_text_batch(mock_llama, mock_model_file):
+    """Test batched correction keeps input order and skips empty text."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+
+        with patch(
+            "satcn.core.filters.grmr_v3_filter.generate_batch",
+            return_value=[" First fixed.", "Second fixed.\n"],
+        ) as mock_generate:
+            result = filter_obj.correct_text_batch(["First broke.", "", "Second broke."])
+
+        assert result == ["First fixed.", "", "Second fixed."]
+        prompts = mock_generate.call_args.args[1]
+        assert len(prompts) == 2
+        assert prompts[0].startswith("First broke.")
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_split_for_correction(mock_llama, mock_model_file):
+    """Test long text splits into sentence groups that rejoin to the original."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+
+        text = "This sentence is about forty characters.  " * 40 + "Last one?\n"
+        chunks = filter_obj._split_for_correction(text)
+
+        assert len(chunks) > 1
+        assert "".join(chunk + separator for chunk, separator in chunks) == text
+        assert all(len(chunk) // 4 <= filter_obj.CHUNK_TOKENS for chunk, _ in chunks)
+        assert all(not chunk[-1].isspace() for chunk, _ in chunks)
+        assert filter_obj._split_for_correction("No sentence end " * 100) == [
+            ("No sentence end " * 100, "")
+        ]
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_correct_text_splits_long_text(mock_llama, mock_model_file):
+    """Test long text is corrected one sentence group at a time."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+
+        filter_obj.llm.return_value = {
+            "choices": [{"text": "Fixed."}],
+            "usage": {"completion_tokens": 2},
+        }
+        text = "This sentence is about forty characters. " * 40
+        chunks = filter_obj._split_for_correction(text)
+
+        result = filter_obj.correct_text(text)
+
+        assert result == "Fixed. " * len(chunks)
+        # Identical groups are served from the cache
+        assert filter_obj.llm.call_count == len({chunk for chunk, _ in chunks})
+
+        with patch(
+            "satcn.core.filters.grmr_v3_filter.generate_batch",
+            side_effect=lambda llm, prompts, **kwargs: ["Fixed."] * len(prompts),
+        ) as mock_generate:
+            filter_obj._cache.clear()
+            assert filter_obj.correct_text_batch([text, "Short broke."]) == [result, "Fixed."]
+
+        # The groups are decoded alongside the short text
+        prompts = mock_generate.call_args.args[1]
+        assert len(prompts) == len({chunk for chunk, _ in chunks}) + 1
+        assert prompts[0].startswith(chunks[0][0])
+
+
 # Test: Pipeline data processing
 
 
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_process_no_text_blocks(mock_llama, mock_model_file):
     """Test processing data without text_blocks."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         data = {"some_other_key": "value"}
@@ -224,7 +564,7 @@ def test_process_no_text_blocks(mock_llama, mock_model_file):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_process_empty_blocks(mock_llama, mock_model_file):
     """Test processing with empty text blocks."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         data = {
@@ -244,8 +584,8 @@ def test_process_empty_blocks(mock_llama, mock_model_file):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_process_corrects_blocks(mock_llama, mock_model_file):
     """Test processing corrects text blocks."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
-        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file), n_parallel=1)
 
         # Create fresh test data
         test_data = {
@@ -270,11 +610,76 @@ def test_process_corrects_blocks(mock_llama, mock_model_file):
         assert "corrected test" in result["text_blocks"][2]["content"]
 
 
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_process_samples_one_block_at_a_time_by_default(mock_llama, mock_model_file):
+    """Test that process() keeps the sampling settings unless batching is opted into."""
+    filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file), temperature=0.3)
+    assert filter_obj.n_parallel == 1
+
+    with patch("satcn.core.filters.grmr_v3_filter.generate_batch") as mock_generate_batch:
+        filter_obj.process({"text_blocks": [{"content": "One.", "metadata": {}}]})
+
+    assert not mock_generate_batch.called
+    assert filter_obj.llm.call_args.kwargs["temperature"] == 0.3
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_process_batches_blocks(mock_llama, mock_model_file):
+    """Test that process() decodes blocks n_parallel at a time, shortest first, in one context."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file), n_parallel=2)
+
+        batches = []
+        contexts = []
+
+        def mock_correct_text_batch(texts, context=None):
+            batches.append(texts)
+            contexts.append(context)
+            return [text.upper() for text in texts]
+
+        filter_obj.correct_text_batch = mock_correct_text_batch
+
+        data = {
+            "text_blocks": [
+                {"content": "A longer first block.", "metadata": {}},
+                {"content": "", "metadata": {}},
+                {"content": "Short.", "metadata": {}},
+                {"content": "Middle block.", "metadata": {}},
+            ]
+        }
+        result = filter_obj.process(data)
+
+        assert batches == [["Short.", "Middle block."], ["A longer first block."]]
+        assert contexts[0] is not None and contexts[0] is contexts[1]
+        assert [block["content"] for block in result["text_blocks"]] == [
+            "A LONGER FIRST BLOCK.",
+            "",
+            "SHORT.",
+            "MIDDLE BLOCK.",
+        ]
+        assert filter_obj.stats["total_blocks_processed"] == 3
+
+
+@pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
+def test_batch_correct(mock_llama, mock_model_file):
+    """Test batch_correct() keeps input order with and without parallel decoding."""
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file), n_parallel=2)
+        filter_obj.correct_text_batch = lambda texts, context=None: [t.upper() for t in texts]
+        filter_obj.correct_text = lambda text: text.lower()
+
+        texts = ["Three words here.", "One.", "", "Two words."]
+        assert filter_obj.batch_correct(texts) == [text.upper() for text in texts]
+
+        filter_obj.n_parallel = 1
+        assert filter_obj.batch_correct(texts) == [text.lower() for text in texts]
+
+
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_process_tracks_corrections(mock_llama, mock_model_file, sample_pipeline_data):
     """Test that process() tracks correction count."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
-        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file), n_parallel=1)
 
         # Mock corrections - only modify some blocks
         call_count = [0]
@@ -300,7 +705,7 @@ def test_process_tracks_corrections(mock_llama, mock_model_file, sample_pipeline
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_get_stats(mock_llama, mock_model_file):
     """Test getting statistics."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         stats = filter_obj.get_stats()
@@ -314,7 +719,7 @@ def test_get_stats(mock_llama, mock_model_file):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_stats_returns_copy(mock_llama, mock_model_file):
     """Test that get_stats() returns a copy, not reference."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         stats1 = filter_obj.get_stats()
@@ -331,7 +736,7 @@ def test_stats_returns_copy(mock_llama, mock_model_file):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_correct_text_long_input_warning(mock_llama, mock_model_file, caplog):
     """Test warning is logged for very long input."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file), n_ctx=100)
 
         # Create a very long text
@@ -352,8 +757,8 @@ def test_correct_text_long_input_warning(mock_llama, mock_model_file, caplog):
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_process_with_missing_content_key(mock_llama, mock_model_file):
     """Test processing blocks that don't have 'content' key."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
-        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
+        filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file), n_parallel=1)
 
         data = {
             "text_blocks": [
@@ -391,7 +796,7 @@ def test_real_model_basic_correction():
 @pytest.mark.skipif(not LLAMA_CPP_AVAILABLE, reason="llama-cpp-python not installed")
 def test_prompt_instructs_name_preservation(mock_llama, mock_model_file):
     """Test that prompt template includes instruction to preserve names."""
-    with patch("pipeline.filters.grmr_v3_filter.Path.exists", return_value=True):
+    with patch("satcn.core.filters.grmr_v3_filter.Path.exists", return_value=True):
         filter_obj = GRMRV3GrammarFilter(model_path=str(mock_model_file))
 
         prompt = filter_obj._build_prompt("Irina went to the store.")
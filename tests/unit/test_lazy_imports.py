@@ -0,0 +1,46 @@
+"""
+Tests that model-backed filters are only imported when first used.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+def test_cli_import_skips_heavy_dependencies():
+    """Importing the CLI must not import torch, transformers or llama.cpp."""
+    code = (
+        "import sys, satcn.cli.main; "
+        "print(sorted({'torch', 'transformers', 'llama_cpp'} & set(sys.modules)))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazy_filter_attributes():
+    """Lazy names resolve on access and unknown names still raise."""
+    from satcn.core import filters
+
+    assert isinstance(filters.T5_AVAILABLE, bool)
+    if filters.T5_AVAILABLE:
+        assert filters.T5GrammarFilter.__name__ == "T5GrammarFilter"
+    else:
+        assert filters.T5GrammarFilter is None
+
+    with pytest.raises(AttributeError):
+        filters.NotAFilter
+
+
+def test_lazy_pipeline_runner_is_cached():
+    """Once resolved, PipelineRunner is a plain module attribute."""
+    import satcn.core
+
+    runner = satcn.core.PipelineRunner
+
+    assert vars(satcn.core)["PipelineRunner"] is runner
@@ -0,0 +1,157 @@
+"""
+Unit tests for llama.cpp helper utilities.
+
+These cover the pure-Python helpers; nothing here loads a model.
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from satcn.core.utils.llama_utils import (
+    BatchContext,
+    generate_batch,
+    length_bins,
+    llama_params,
+    physical_cores,
+    pick_quant,
+)
+
+
+class TestLlamaParams:
+    """Test suite for llama_params()."""
+
+    def test_gpu_params(self):
+        """GPU runs keep the KV cache on device."""
+        params = llama_params(gpu=True)
+
+        assert params["offload_kqv"] is True
+        assert params["flash_attn"] is True
+        assert params["logits_all"] is False
+        assert "n_threads" not in params
+
+    def test_cpu_params(self):
+        """CPU runs set an explicit thread count."""
+        params = llama_params(gpu=False)
+
+        assert params["n_threads"] >= 1
+        assert params["n_threads_batch"] == params["n_threads"]
+        assert "offload_kqv" not in params
+        assert "flash_attn" not in params
+
+
+class TestPhysicalCores:
+    """Test suite for physical_cores()."""
+
+    def test_counts_cores(self):
+        """The count is positive and never exceeds the usable logical CPUs."""
+        assert 1 <= physical_cores() <= (os.cpu_count() or 1)
+
+    def test_without_psutil(self):
+        """Without psutil, SMT is assumed and half the logical CPUs are used."""
+        with (
+            patch.dict("sys.modules", {"psutil": None}),
+            patch("os.sched_getaffinity", return_value=set(range(8)), create=True),
+        ):
+            assert physical_cores() == 4
+
+
+class TestPickQuant:
+    """Test suite for pick_quant()."""
+
+    def test_prefers_q8_sibling_on_cpu(self, tmp_path):
+        """A Q8_0 sibling is chosen when running on CPU only."""
+        q4 = tmp_path / "GRMR-V3-Q4B.Q4_K_M.gguf"
+        q8 = tmp_path / "GRMR-V3-Q4B.Q8_0.gguf"
+        q4.touch()
+        q8.touch()
+
+        assert pick_quant(q4, n_gpu_layers=0) == q8
+
+    def test_keeps_q4_on_gpu(self, tmp_path):
+        """The requested file is kept when layers are offloaded."""
+        q4 = tmp_path / "GRMR-V3-Q4B.Q4_K_M.gguf"
+        q4.touch()
+        (tmp_path / "GRMR-V3-Q4B.Q8_0.gguf").touch()
+
+        assert pick_quant(q4, n_gpu_layers=-1) == q4
+
+    def test_missing_sibling(self, tmp_path):
+        """The requested file is kept when no Q8_0 sibling exists."""
+        q4 = tmp_path / "GRMR-V3-Q4B.Q4_K_M.gguf"
+        q4.touch()
+
+        assert pick_quant(q4, n_gpu_layers=0) == q4
+
+
+class TestLengthBins:
+    """Test suite for length_bins()."""
+
+    def test_bins_cover_all_indices(self):
+        """Every index appears exactly once across the bins."""
+        lengths = [5, 1, 9, 3, 7, 2, 8, 4, 6, 0]
+        bins = length_bins(lengths, n_bins=4)
+
+        assert len(bins) == 4
+        assert sorted(i for b in bins for i in b) == list(range(len(lengths)))
+
+    def test_bins_sorted_by_length(self):
+        """Bins go from shortest to longest items."""
+        lengths = [5, 1, 9, 3, 7, 2, 8, 4, 6, 0]
+        bins = length_bins(lengths, n_bins=4)
+
+        maxima = [max(lengths[i] for i in b) for b in bins]
+        minima = [min(lengths[i] for i in b) for b in bins]
+        assert all(hi <= lo for hi, lo in zip(maxima, minima[1:], strict=False))
+
+    def test_fewer_items_than_bins(self):
+        """Empty bins are omitted."""
+        assert length_bins([3, 1], n_bins=4) == [[1], [0]]
+        assert length_bins([]) == []
+
+
+class TestGenerateBatch:
+    """Test suite for generate_batch()."""
+
+    def test_rejects_empty_prompt(self):
+        """A prompt without tokens has no logits of its own to continue from."""
+        pytest.importorskip("llama_cpp")
+        llm = MagicMock()
+        llm.tokenize.side_effect = lambda text, **kwargs: list(text)
+
+        with pytest.raises(ValueError, match=r"\[1\]"):
+            generate_batch(llm, ["Fix this.", ""], prefix="### Instruction\n")
+        assert not llm.n_vocab.called
+
+
+class TestBatchContext:
+    """Test suite for BatchContext."""
+
+    def test_reuses_context_that_fits(self):
+        """A context is cleared and reused while requests fit, and grows otherwise."""
+        llama_cpp = pytest.importorskip("llama_cpp")
+        with patch.multiple(
+            llama_cpp,
+            llama_new_context_with_model=MagicMock(side_effect=lambda model, params: object()),
+            llama_batch_init=MagicMock(),
+            llama_batch_free=MagicMock(),
+            llama_free=MagicMock(),
+            llama_memory_clear=MagicMock(),
+            llama_get_memory=MagicMock(),
+            create=True,
+        ):
+            with BatchContext(MagicMock()) as context:
+                context.prepare(n_ctx=100, n_batch=50, n_seqs=2)
+                first = context.ctx
+                context.prepare(n_ctx=80, n_batch=50, n_seqs=2)
+                assert context.ctx is first
+                assert llama_cpp.llama_memory_clear.call_count == 1
+
+                context.prepare(n_ctx=120, n_batch=50, n_seqs=2)
+                assert context.ctx is not first
+                assert (context.n_ctx, context.n_batch) == (200, 100)
+
+            assert context.ctx is None
+            assert llama_cpp.llama_new_context_with_model.call_count == 2
+            assert llama_cpp.llama_free.call_count == 2
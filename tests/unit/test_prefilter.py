@@ -0,0 +1,102 @@
+"""
+Unit tests for the cheap pre-filter that decides when a model call can be skipped.
+"""
+
+from satcn.core.utils.prefilter import (
+    count_misspellings,
+    count_punctuation_anomalies,
+    looks_clean,
+    needs_rule_check,
+)
+
+
+class TestCountMisspellings:
+    """Test suite for count_misspellings()."""
+
+    def test_clean_text(self):
+        """Dictionary words and contractions are not flagged."""
+        assert count_misspellings("It's fine, isn't it? She didn't mind.") == 0
+
+    def test_lowercase_typos(self):
+        """Unknown lowercase words are counted."""
+        assert count_misspellings("The cat sat on teh mat and dont move.") == 2
+
+    def test_mid_sentence_names_ignored(self):
+        """Capitalized words inside a sentence are treated as names."""
+        assert count_misspellings("She waved at Irina and Volin.") == 0
+
+    def test_sentence_initial_typo(self):
+        """A capitalized sentence opener one edit from a real word is counted."""
+        assert count_misspellings("Teh door opened.") == 1
+
+
+class TestCountPunctuationAnomalies:
+    """Test suite for count_punctuation_anomalies()."""
+
+    def test_clean_text(self):
+        """Well-formed punctuation has no anomalies."""
+        assert count_punctuation_anomalies('"Where?" she asked. He shrugged.') == 0
+
+    def test_space_before_punctuation(self):
+        """Whitespace before punctuation is flagged."""
+        assert count_punctuation_anomalies("She said hello , then left.") == 1
+
+    def test_double_space(self):
+        """Doubled spaces are flagged."""
+        assert count_punctuation_anomalies("He left.  She stayed.") == 1
+
+    def test_missing_capitalization(self):
+        """Lowercase sentence openers are flagged."""
+        assert count_punctuation_anomalies("he left. she stayed.") == 2
+
+
+class TestLooksClean:
+    """Test suite for looks_clean()."""
+
+    def test_short_clean_text(self):
+        """Short text without problems can skip the model."""
+        assert looks_clean("Audra smiled. Seraphim did not.")
+
+    def test_text_with_errors(self):
+        """Text with surface errors needs the model."""
+        assert not looks_clean("I dont know what your talking about.")
+        assert not looks_clean("She said hello , then left.")
+
+    def test_long_text(self):
+        """Long text always needs the model, even when it looks clean."""
+        assert not looks_clean("The dog ran home. " * 10)
+        assert looks_clean("The dog ran home. " * 10, max_words=50)
+
+
+class TestNeedsRuleCheck:
+    """Test suite for needs_rule_check()."""
+
+    def test_clean_text(self):
+        """Plain, correctly spelled sentences can skip LanguageTool."""
+        assert not needs_rule_check("The cat sat on the mat.")
+        assert not needs_rule_check("Don't wake the cat's owner.\nThe rain stopped.")
+
+    def test_surface_patterns(self):
+        """Anything a safe rule could fix is sent to LanguageTool."""
+        assert needs_rule_check("It was the the end.")
+        assert needs_rule_check("See the (draft) notes.")
+        assert needs_rule_check('She said "hi" twice.')
+        assert needs_rule_check("The end.Next chapter.")
+        assert needs_rule_check("the cat sat.")
+        assert needs_rule_check("Two  spaces here.")
+        assert needs_rule_check("The end. (the start.")
+        assert needs_rule_check("'Quoted' words.")
+        assert needs_rule_check("Tabs\t\there.")
+
+    def test_pronouns(self):
+        """Pronouns may disagree with their verbs, which only LanguageTool can judge."""
+        assert needs_rule_check("I is going home.")
+        assert needs_rule_check("The dog followed them home.")
+
+    def test_misspellings(self):
+        """Misspelled words need a check even without punctuation issues."""
+        assert needs_rule_check("She recieved the letter today.")
+
+    def test_capitalized_misspellings(self):
+        """Unknown capitalized words mid-sentence are checked too, not taken for names."""
+        assert needs_rule_check("The letter came on Wensday.")
@@ -1,4 +1,8 @@
-from satcn.core.filters.spelling_filter import SpellingCorrectionFilter
+from unittest.mock import patch
+
+import pytest
+
+from satcn.core.filters.spelling_filter import SYMSPELL_AVAILABLE, SpellingCorrectionFilter
 
 
 def test_spelling_correction():
@@ -39,3 +43,87 @@ def test_spelling_correction_case_insensitive():
     }
     corrected_data = filtr.process(data)
     assert corrected_data["text_blocks"][0]["content"] == "This is a sentence with a misspelling."
+
+
+def test_spelling_correction_repeated_words():
+    """
+    Tests that every occurrence of a misspelled word is corrected, in any case.
+    """
+    filtr = SpellingCorrectionFilter()
+    data = {
+        "text_blocks": [
+            {"type": "paragraph", "content": "A sentance, a Sentance, and one more sentance."}
+        ]
+    }
+    corrected_data = filtr.process(data)
+    assert (
+        corrected_data["text_blocks"][0]["content"]
+        == "A sentence, a sentence, and one more sentence."
+    )
+
+
+def test_spelling_correction_looks_up_words_once():
+    """
+    Tests that a misspelled word repeated across blocks is looked up once per document.
+    """
+    filtr = SpellingCorrectionFilter()
+    data = {
+        "text_blocks": [
+            {"type": "paragraph", "content": "One sentance."},
+            {"type": "paragraph", "content": ""},
+            {"type": "paragraph", "content": "Another sentance."},
+        ]
+    }
+    checker_class = type(filtr.spell)
+    with patch.object(
+        checker_class, "correction", autospec=True, side_effect=checker_class.correction
+    ) as mock_correction:
+        corrected_data = filtr.process(data)
+
+    assert [block["content"] for block in corrected_data["text_blocks"]] == [
+        "One sentence.",
+        "",
+        "Another sentence.",
+    ]
+    mock_correction.assert_called_once_with(filtr.spell, "sentance")
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        "pyspellchecker",
+        pytest.param(
+            "symspell",
+            marks=pytest.mark.skipif(not SYMSPELL_AVAILABLE, reason="symspellpy not installed"),
+        ),
+    ],
+)
+def test_spelling_backends_agree(backend):
+    """
+    Tests that both spelling backends make the same corrections and leave numbers alone.
+    """
+    filtr = SpellingCorrectionFilter(backend=backend)
+    assert filtr.backend == backend
+    data = {
+        "text_blocks": [
+            {"type": "paragraph", "content": "Teh Sentance was recieved in 1984."},
+        ]
+    }
+    corrected_data = filtr.process(data)
+    assert corrected_data["text_blocks"][0]["content"] == "the sentence was received in 1984."
+
+
+def test_spelling_backend_validation():
+    """
+    Tests the default backend, and that an unknown backend is rejected and a
+    missing symspellpy is reported.
+    """
+    with pytest.raises(ValueError, match="Unknown spelling backend"):
+        SpellingCorrectionFilter(backend="hunspell")
+
+    assert SpellingCorrectionFilter().backend == "pyspellchecker"
+
+    with patch("satcn.core.filters.spelling_filter.SYMSPELL_AVAILABLE", False):
+        assert SpellingCorrectionFilter(backend="auto").backend == "pyspellchecker"
+        with pytest.raises(ImportError, match="spell-fast"):
+            SpellingCorrectionFilter(backend="symspell")
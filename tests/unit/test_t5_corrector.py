@@ -39,7 +39,7 @@ class TestT5CorrectorInit:
         assert corrector.model_name == T5Corrector.DEFAULT_MODEL
         assert corrector.device == "cpu"
         assert corrector.max_length == 512
-        assert corrector.num_beams == 4
+        assert corrector.num_beams == 1
         assert corrector.use_half_precision is True
 
     @patch("satcn.correction.t5_corrector.AutoTokenizer")
@@ -173,14 +173,20 @@ class TestT5CorrectorCorrection:
 class TestT5CorrectorBatch:
     """Test T5Corrector batch processing."""
 
-    @patch("satcn.correction.t5_corrector.AutoTokenizer")
-    @patch("satcn.correction.t5_corrector.AutoModelForSeq2SeqLM")
-    @patch("satcn.correction.t5_corrector.torch")
-    def setup_method(self, method):
-        """Set up test fixtures."""
+    @pytest.fixture(autouse=True)
+    def corrector(self):
+        """Set up a corrector with the model, tokenizer and torch mocked out."""
         from satcn.correction import T5Corrector
 
-        self.corrector = T5Corrector()
+        with (
+            patch("satcn.correction.t5_corrector.AutoTokenizer"),
+            patch("satcn.correction.t5_corrector.AutoModelForSeq2SeqLM"),
+            patch("satcn.correction.t5_corrector.torch") as mock_torch,
+        ):
+            mock_torch.cuda.is_available.return_value = False
+            mock_torch.backends.mps.is_available.return_value = False
+            self.corrector = T5Corrector()
+            yield self.corrector
 
     def test_correct_batch_empty_list(self):
         """Test batch correction with empty list."""
@@ -189,19 +195,82 @@ class TestT5CorrectorBatch:
 
     def test_correct_batch_single_item(self):
         """Test batch correction with single item."""
-        with patch.object(self.corrector, "correct", return_value="corrected"):
+        with patch.object(self.corrector, "_correct_chunk", return_value=["corrected"]):
             results = self.corrector.correct_batch(["test"])
             assert len(results) == 1
 
     def test_correct_batch_multiple_items(self):
         """Test batch correction with multiple items."""
-        with patch.object(self.corrector, "correct", side_effect=lambda x: f"corrected_{x}"):
+        with patch.object(
+            self.corrector,
+            "_correct_chunk",
+            side_effect=lambda chunk: [f"corrected_{x}" for x in chunk],
+        ):
             texts = ["text1", "text2", "text3"]
             results = self.corrector.correct_batch(texts)
 
             assert len(results) == 3
             assert results == ["corrected_text1", "corrected_text2", "corrected_text3"]
 
+    def test_correct_batch_preserves_order_across_chunks(self):
+        """Test that length sorting and chunking do not reorder results."""
+        with patch.object(
+            self.corrector,
+            "_correct_chunk",
+            side_effect=lambda chunk: [x.upper() for x in chunk],
+        ) as mock_chunk:
+            texts = ["a much longer text", "", "mid text", "short"]
+            results = self.corrector.correct_batch(texts, batch_size=2)
+
+            assert results == ["A MUCH LONGER TEXT", "", "MID TEXT", "SHORT"]
+            assert mock_chunk.call_count == 2
+
+    def test_correct_batch_falls_back_on_error(self):
+        """Test that a failed chunk is retried one text at a time."""
+        with (
+            patch.object(self.corrector, "_correct_chunk", side_effect=RuntimeError("OOM")),
+            patch.object(self.corrector, "correct", side_effect=lambda x: f"single_{x}"),
+        ):
+            results = self.corrector.correct_batch(["text1", "text2"])
+
+            assert results == ["single_text1", "single_text2"]
+
+    def test_correct_batch_reuses_corrections(self):
+        """Test that repeated and previously corrected texts are generated once."""
+        with patch.object(
+            self.corrector,
+            "_correct_chunk",
+            side_effect=lambda chunk: [x.upper() for x in chunk],
+        ) as mock_chunk:
+            results = self.corrector.correct_batch(["same", "other", "same"])
+            assert results == ["SAME", "OTHER", "SAME"]
+            assert sorted(mock_chunk.call_args.args[0]) == ["other", "same"]
+
+            assert self.corrector.correct_batch(["other", "same"]) == ["OTHER", "SAME"]
+            assert self.corrector.correct("same") == "SAME"
+            assert mock_chunk.call_count == 1
+
+        stats = self.corrector.get_stats()
+        assert stats["texts_processed"] == 6
+        assert stats["corrections_made"] == 6
+
+    def test_correct_chunk_warns_on_truncation(self, caplog):
+        """Test that the batched path warns about each text cut to max_length."""
+        torch = pytest.importorskip("torch")
+        max_length = self.corrector.max_length
+        self.corrector.tokenizer.return_value = {
+            "input_ids": torch.ones((2, max_length), dtype=torch.long),
+            "attention_mask": torch.tensor([[1] * max_length, [1] * 3 + [0] * (max_length - 3)]),
+        }
+        self.corrector.tokenizer.batch_decode.return_value = ["long", "short"]
+
+        with caplog.at_level("WARNING"):
+            self.corrector._correct_chunk(["long text", "short"])
+
+        warnings = [r.getMessage() for r in caplog.records if "truncated" in r.getMessage()]
+        assert len(warnings) == 1
+        assert "9 chars" in warnings[0]
+
 
 class TestT5CorrectorPipeline:
     """Test T5Corrector pipeline integration."""
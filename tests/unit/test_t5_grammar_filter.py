@@ -1,5 +1,6 @@
 # tests/unit/test_t5_grammar_filter.py
 
+from unittest.mock import patch
 
 import pytest
 
@@ -62,6 +63,54 @@ class TestT5GrammarFilter:
         assert filter_instance.correct_text("") == ""
         assert filter_instance.correct_text("   ") == "   "
 
+    def test_correct_text_batch(self):
+        """Test batched correction keeps input order and empty inputs."""
+        filter_instance = T5GrammarFilter()
+
+        texts = ["This sentence have an error.", "", "Ther are speling misteaks."]
+        corrected = filter_instance.correct_text_batch(texts)
+
+        assert len(corrected) == 3
+        assert corrected[1] == ""
+        assert corrected[0] == filter_instance.correct_text(texts[0])
+
+    def test_correct_text_batch_duplicates(self):
+        """Test repeated texts are encoded once and corrected identically."""
+        filter_instance = T5GrammarFilter()
+
+        texts = ["Ther are speling misteaks.", "* * *", "Ther are speling misteaks."]
+        corrected = filter_instance.correct_text_batch(texts)
+
+        assert corrected[0] == corrected[2]
+        assert filter_instance._encode.cache_info().currsize == 2
+
+    def test_correct_text_batch_reuses_corrections(self):
+        """Test texts corrected by an earlier call are served from the cache."""
+        filter_instance = T5GrammarFilter()
+
+        first = filter_instance.correct_text_batch(["Ther are speling misteaks."])
+        generated = []
+        generate = filter_instance._generate
+        filter_instance._generate = lambda texts: generated.append(texts) or generate(texts)
+
+        second = filter_instance.correct_text_batch(["Ther are speling misteaks.", "* * *"])
+
+        assert second[0] == first[0]
+        assert generated == [["* * *"]]
+        assert filter_instance.correct_text("* * *") == second[1]
+        assert len(generated) == 1
+
+    def test_batch_size(self, sample_data):
+        """Test that process() generates in batches of the configured size."""
+        filter_instance = T5GrammarFilter(batch_size=2)
+        batches = []
+        generate = filter_instance._generate
+        filter_instance._generate = lambda texts: batches.append(texts) or generate(texts)
+
+        filter_instance.process(sample_data)
+
+        assert [len(batch) for batch in batches] == [2, 1]
+
     def test_process_pipeline_data(self, sample_data):
         """Test processing pipeline data structure."""
         filter_instance = T5GrammarFilter()
@@ -100,6 +149,47 @@ class TestT5GrammarFilter:
         filter_instance = T5GrammarFilter(device="cpu")
         assert filter_instance.device == "cpu"
 
+    def test_dtype_selection(self):
+        """Test that dtype names are resolved to the loaded weight precision."""
+        filter_instance = T5GrammarFilter(device="cpu", dtype="bfloat16")
+        assert next(filter_instance.model.parameters()).dtype == torch.bfloat16
+
+    def test_quantization_validation(self):
+        """Test that unsupported quantization settings are rejected before loading."""
+        with pytest.raises(ValueError):
+            T5GrammarFilter(device="cuda", quantization="int4")
+
+        with pytest.raises(ValueError):
+            T5GrammarFilter(device="cpu", quantization="int8")
+
+    @pytest.mark.parametrize("bf16_supported, expected", [(True, "bfloat16"), (False, "float16")])
+    def test_nf4_compute_dtype(self, bf16_supported, expected):
+        """Test that NF4 computes in the same 16-bit type as the unquantized modules."""
+        module = "satcn.core.filters.t5_grammar_filter"
+        with (
+            patch(f"{module}.AutoTokenizer"),
+            patch(f"{module}.AutoModelForSeq2SeqLM") as mock_model_class,
+            patch(f"{module}.BitsAndBytesConfig") as mock_config,
+            patch("torch.cuda.is_bf16_supported", return_value=bf16_supported),
+            patch("torch.cuda.current_device", return_value=0),
+        ):
+            T5GrammarFilter(device="cuda", quantization="nf4")
+
+        compute_dtype = mock_config.call_args.kwargs["bnb_4bit_compute_dtype"]
+        assert compute_dtype == getattr(torch, expected)
+        assert mock_model_class.from_pretrained.call_args.kwargs["torch_dtype"] == compute_dtype
+
+    def test_backend_validation(self):
+        """Test that unsupported backend settings are rejected before loading."""
+        with pytest.raises(ValueError):
+            T5GrammarFilter(device="cpu", backend="tf")
+
+        with pytest.raises(ValueError):
+            T5GrammarFilter(device="cpu", backend="trt")
+
+        with pytest.raises(ValueError):
+            T5GrammarFilter(device="cuda", backend="ort", quantization="int8")
+
 
 @pytest.mark.skipif(TRANSFORMERS_AVAILABLE, reason="Test only when dependencies are missing")
 def test_missing_dependencies():